@@ -1,5 +1,6 @@
 import contextlib
 import math
+import subprocess
 import sys
 from time import time
 import timeit as _timeit
@@ -287,6 +288,9 @@ def prs_bench(rand: Random):
     ns = {"encoded": encoded, "Logs": Logs}
 
     print(" - parse:", timeit(code, ns=ns, number=1))
+
+    code = "Logs.parseAs(encoded, tuple)"
+    print(" - parse as tuples:", timeit(code, ns=ns, number=1))
     # print(Logs.parse(encoded))
 
     return dataset
@@ -308,7 +312,26 @@ def pickle_bench(rand: Random):
     return dataset
 
 
+def import_bench(runs=20):
+    print("Import benchmark")
+    # `-X importtime` reports the cumulative microseconds of every import,
+    # the last line being the top-level one
+    all_runs = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import pynarist"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        line = result.stderr.splitlines()[-1]
+        all_runs.append(int(line.split("|")[1]) / 1e6)
+    best, worst = min(all_runs), max(all_runs)
+    print(" - import:", TimeitResult(1, runs, best, worst, all_runs, 3))
+
+
 def bench():
+    import_bench()
     seed = time()
     pickle_bench(Random(seed))
     prs_bench(Random(seed))
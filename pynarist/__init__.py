@@ -29,21 +29,43 @@ assert parsed.age == 25
 
 __all__ = [
     "Model",
+    "Decoder",
+    "FramedSocket",
+    "BufferPool",
+    "ParseLimits",
+    "parseFramed",
     "long",
     "short",
     "byte",
+    "bits",
     "half",
     "double",
     "char",
     "varchar",
     "fixedstring",
+    "blob",
+    "fixedbytes",
+    "interned",
+    "undecoded",
     "array",
     "vector",
+    "chunked",
+    "delta",
+    "packed",
+    "endian",
+    "union",
+    "optional",
+    "since",
+    "deprecated",
     "null",
     "ignore",
 ]
 
 from .model import Model
+from ._stream import Decoder
+from ._framing import BufferPool, FramedSocket
+from ._limits import ParseLimits
+from ._schema import parseFramed
 from ._impls import (
     # placeholder flags
     null,
@@ -52,6 +74,7 @@ from ._impls import (
     long,
     short,
     byte,
+    bits,
     # float flags
     half,
     double,
@@ -59,7 +82,23 @@ from ._impls import (
     char,
     varchar,
     fixedstring,
+    interned,
+    undecoded,
+    # bytes flags
+    blob,
+    fixedbytes,
     # iterable flags
     array,
     vector,
+    chunked,
+    delta,
+    packed,
+    # byte order flags
+    endian,
+    # variant flags
+    union,
+    optional,
+    # schema evolution flags
+    since,
+    deprecated,
 )
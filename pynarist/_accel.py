@@ -0,0 +1,403 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+"""
+Specialized build and parse functions, generated from a model's plan.
+
+The generated code walks the plan without any per-step dispatch: runs are
+packed and unpacked with their struct directly, strings and vectors of
+nested models are inlined, other fields call the bound methods of their
+impls, and records are created without going through `Model.__init__` when
+the model does not override it. The generic loops in `Model` stay the
+reference implementation; set `PYNARIST_NO_ACCEL=1` to use them only.
+"""
+
+import os
+import struct
+from typing import Any, Callable
+
+from pynarist._cache import compileCached
+from pynarist._impls import (
+    TEXT_COPY_LIMIT,
+    ImplBlob,
+    ImplString,
+    ImplTextMode,
+    ImplVarChar,
+    ImplVector,
+    Implementation,
+    checkLength,
+    checkString,
+    decodeText,
+    getImpl,
+)
+from pynarist._limits import activeLimits
+from pynarist._shapes import convert, holdsModels, isModel, nestedTarget
+from pynarist._plan import (
+    VERSION_HEADER,
+    Layout,
+    OptionalField,
+    Plan,
+    Run,
+    readPresence,
+)
+
+ENABLED = not os.environ.get("PYNARIST_NO_ACCEL")
+
+_BYTE = struct.Struct("B")
+
+
+class _Source:
+    """Collects the lines and globals of a generated function."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.globals: dict[str, Any] = {}
+        self.counter = 0
+
+    def name(self, prefix: str, value: Any = None) -> str:
+        self.counter += 1
+        name = f"{prefix}{self.counter}"
+        if value is not None:
+            self.globals[name] = value
+        return name
+
+    def add(self, indent: int, *lines: str) -> None:
+        self.lines.extend(" " * indent + line for line in lines)
+
+    def compile(self, name: str, filename: str) -> Callable:
+        code = compileCached("\n".join(self.lines), filename)
+        namespace: dict[str, Any] = {}
+        exec(code, self.globals, namespace)
+        return namespace[name]
+
+
+def _nestedModel(impl: Implementation) -> type | None:
+    # the element model of a vector, if its plan can be called directly
+    if type(impl) is not ImplVector:
+        return None
+    element = impl.__pynarist_redirector__.TYPE_ELEMENT
+    if getattr(element, "__pynarist_plan__", False) is False:
+        return None
+    # versioned records are parsed through their envelope
+    if element.compile().version:
+        return None
+    return element
+
+
+def _fastInit(model: type) -> bool:
+    from pynarist.model import Model
+
+    return model.__init__ is Model.__init__  # type: ignore
+
+
+def _field(model: type, owner: str, name: str, shape: Any) -> str:
+    # the expression reading field `name` of `owner`, a record of `model`
+    # or its form as `shape`
+    if shape is dict:
+        return f"{owner}[{name!r}]"
+    if shape is tuple:
+        return f"{owner}[{list(model.fields).index(name)}]"
+    return f"{owner}.{name}"
+
+
+def _flatten(
+    source: _Source,
+    model: type,
+    layout: Layout,
+    owner: str,
+    values: list[str],
+    shape: Any,
+) -> None:
+    for name, nested in layout:
+        if nested is None:
+            values.append(_field(model, owner, name, shape))
+        else:
+            local = source.name("_n")
+            source.add(8, f"{local} = {_field(model, owner, name, shape)}")
+            _flatten(source, nested[0], nested[1], local, values, shape)
+
+
+def generateBuild(
+    plan: Plan, model: type, fallback: Callable, shape: Any = None
+) -> Callable:
+    """
+    Generate `build(record) -> bytes`. Missing fields and values the fast
+    path cannot pack are handed to `fallback`, the generic build.
+
+    With a `shape` of `dict`, `tuple` or `object`, the function builds the
+    record from that form of it instead, as `Model.buildFrom()` takes it.
+    """
+    source = _Source()
+    source.globals.update(
+        _fallback=fallback,
+        _error=(AttributeError, TypeError, KeyError, IndexError, struct.error),
+    )
+    source.add(0, "def build(self):", "    try:")
+    parts = []
+    if plan.presence:
+        source.add(8, "presence = 0")
+        parts.append(f"presence.to_bytes({plan.presence}, 'little')")
+    for step in plan.steps:
+        if type(step) is OptionalField:
+            value, part = source.name("_v"), source.name("_p")
+            build = source.name("_build", step.impl.build)
+            if shape is dict:
+                read = f"self.get({step.name!r})"
+            elif shape is tuple:
+                read = _field(model, "self", step.name, shape)
+            else:
+                read = f"getattr(self, {step.name!r}, None)"
+            source.add(
+                8,
+                f"{value} = {read}",
+                f"if {value} is None:",
+                f"    {part} = b''",
+                "else:",
+                f"    presence |= {step.mask}",
+                f"    {part} = {build}({value})",
+            )
+            parts.append(part)
+            continue
+
+        if type(step) is Run:
+            values: list[str] = []
+            _flatten(source, model, step.layout, "self", values, shape)
+            pack = source.name("_pack", step.format.pack)
+            parts.append(f"{pack}({', '.join(values)})")
+            continue
+
+        key, impl = step
+        field = _field(model, "self", key, shape)
+        element = _nestedModel(impl)
+        nested = getattr(impl, "__pynarist_redirector__", None)
+        if type(impl) is ImplVarChar:
+            encoded = source.name("_e")
+            source.add(8, f"{encoded} = {field}.encode('utf-8')")
+            parts += [f"_byte({encoded}.__len__())", encoded]
+        elif element is not None:
+            items = source.name("_items")
+            if shape is not None:
+                build = source.name("_build", element._builder(shape))
+            elif element.__pynarist_frozen__:
+                # frozen records splice in their cached bytes
+                build = source.name("_build", element.build)
+            else:
+                build = source.name("_build", element.compile().build)
+            prefix = source.name("_prefix", impl.prefix.pack)  # type: ignore
+            source.add(8, f"{items} = {field}")
+            parts += [f"{prefix}(len({items}))", f"*[{build}(x) for x in {items}]"]
+        elif shape is not None and isModel(nested):
+            parts.append(f"{source.name('_build', nested._builder(shape))}({field})")
+        else:
+            parts.append(f"{source.name('_build', impl.build)}({field})")
+    source.globals["_byte"] = _BYTE.pack
+    joined = f"b''.join(({''.join(part + ', ' for part in parts)}))"
+    if plan.version:
+        source.globals["_header"] = VERSION_HEADER.pack
+        source.add(
+            8,
+            f"body = {joined}",
+            f"return _header({plan.version}, {plan.presence}, len(body)) + body",
+        )
+    else:
+        source.add(8, f"return {joined}")
+    source.add(4, "except _error:", "    return _fallback(self)")
+    kind = "" if shape is None else f" from {shape.__name__}"
+    return source.compile("build", f"<pynarist build {model.__qualname__}{kind}>")
+
+
+def _construct(
+    source: _Source, model: type, fields: list[tuple[str, str]], shape: Any = None
+) -> str:
+    if shape is not None:
+        # every field, those the plan skips taking their default
+        values = dict(fields)
+        for name in model.fields:
+            if name not in values:
+                default = getattr(model, name, None)
+                values[name] = "None" if default is None else source.name("_default", default)
+        if shape is dict:
+            return f"{{{', '.join(f'{name!r}: {values[name]}' for name in model.fields)}}}"
+        if shape is tuple:
+            return f"({''.join(values[name] + ', ' for name in model.fields)})"
+        target = source.name("_target", shape)
+        arguments = ", ".join(f"{name}={values[name]}" for name in model.fields)
+        return f"{target}({arguments})"
+
+    model_name = source.name("_model", model)
+    arguments = ", ".join(f"{key}={value}" for key, value in fields)
+    if not _fastInit(model):
+        return f"{model_name}({arguments})"
+    local = source.name("_o")
+    source.add(4, f"{local} = _new({model_name})")
+    if fields:
+        source.add(4, f"{local}.__dict__.update({arguments})")
+    return local
+
+
+def _count(layout: Layout) -> int:
+    return sum(1 if nested is None else _count(nested[1]) for _, nested in layout)
+
+
+def _unflatten(
+    source: _Source, layout: Layout, values: list[str], shape: Any
+) -> list[tuple[str, str]]:
+    fields = []
+    for name, nested in layout:
+        if nested is None:
+            fields.append((name, values.pop(0)))
+        else:
+            model, sublayout = nested
+            target = None if shape is None else nestedTarget(shape, name)
+            nested_fields = _unflatten(source, sublayout, values, target)
+            fields.append((name, _construct(source, model, nested_fields, target)))
+    return fields
+
+
+def generateParse(plan: Plan, model: type, shape: Any = None) -> Callable:
+    """
+    Generate `parse(view, offset) -> (record, end)`, where `view` is a
+    memoryview of the input.
+
+    With a `shape`, the target of `Model.parseAs()`, the function returns
+    the record in that form, without creating records of any model.
+    """
+    source = _Source()
+    source.globals.update(
+        _new=object.__new__,
+        _active=activeLimits,
+        _byte=_BYTE.unpack_from,
+        _checkLength=checkLength,
+        _checkString=checkString,
+        _readPresence=readPresence,
+    )
+    source.add(
+        0,
+        "def parse(view, offset):",
+        "    state = _active.get()",
+        "    if state is not None:",
+        "        state.enter()",
+    )
+    if plan.presence:
+        source.add(
+            4,
+            f"presence = _readPresence(view, {plan.presence}, offset)",
+            f"offset += {plan.presence}",
+        )
+    fields: list[tuple[str, str]] = []
+    for step in plan.steps:
+        if type(step) is OptionalField:
+            value = source.name("_f")
+            parse = source.name("_parse", step.impl.parseWithSize)
+            source.add(
+                4,
+                f"if presence & {step.mask}:",
+                f"    {value}, size = {parse}(view[offset:])",
+                "    offset += size",
+                "else:",
+                f"    {value} = None",
+            )
+            if step.name not in plan.deprecated:
+                _convert(source, model, step.name, value, shape)
+                fields.append((step.name, value))
+            continue
+
+        if type(step) is Run:
+            values = [source.name("_v") for _ in range(_count(step.layout))]
+            unpack = source.name("_unpack", step.format.unpack_from)
+            target = ", ".join(values) + ("," if len(values) == 1 else "")
+            source.add(4, f"{target} = {unpack}(view, offset)")
+            source.add(4, f"offset += {step.format.size}")
+            fields += _unflatten(source, step.layout, values, shape)
+            continue
+
+        key, impl = step
+        value = source.name("_f")
+        if key in plan.deprecated:
+            skip = source.name("_skip", impl.skip)  # type: ignore
+            source.add(4, f"offset += {skip}(view[offset:])")
+            continue
+        if type(impl) is ImplTextMode:
+            impl = impl._impl()
+        element = _nestedModel(impl)
+        nested = getattr(impl, "__pynarist_redirector__", None)
+        target = None if shape is None else nestedTarget(shape, key)
+        if type(impl) in (ImplVarChar, ImplString):
+            if type(impl) is ImplVarChar:
+                length, width = "_byte", 1
+            else:
+                length, width = source.name("_length", impl.prefix.unpack_from), 4  # type: ignore
+            source.add(
+                4,
+                f"size = {length}(view, offset)[0]",
+                f"offset += {width}",
+                "if size > len(view) - offset or state is not None:",
+                "    _checkString(size, len(view) - offset)",
+            )
+            if impl.decode is decodeText:  # type: ignore
+                # inlined `decodeText()`
+                source.add(
+                    4,
+                    f"if size > {TEXT_COPY_LIMIT}:",
+                    f"    {value} = str(view[offset:offset + size], 'utf-8')",
+                    "else:",
+                    f"    {value} = view[offset:offset + size].tobytes().decode()",
+                )
+            else:
+                decode = source.name("_decode", impl.decode)  # type: ignore
+                source.add(4, f"{value} = {decode}(view[offset:offset + size])")
+            source.add(4, "offset += size")
+        elif type(impl) is ImplBlob:
+            length = source.name("_length", impl.prefix.unpack_from)
+            source.add(
+                4,
+                f"size = {length}(view, offset)[0]",
+                "offset += 4",
+                "if size > len(view) - offset or state is not None:",
+                "    _checkString(size, len(view) - offset)",
+                f"{value} = view[offset:offset + size]",
+                "offset += size",
+            )
+        elif element is not None:
+            element_impl = source.name("_impl", getImpl(element, impl.byteorder))  # type: ignore
+            if shape is None:
+                parse = source.name("_parse", element.compile().parse)
+            else:
+                parse = source.name("_parse", element._parser(target))
+            length = source.name("_length", impl.prefix.unpack_from)  # type: ignore
+            source.add(
+                4,
+                f"size = {length}(view, offset)[0]",
+                "offset += 4",
+                f"_checkLength(size, {element_impl}, len(view) - offset)",
+                f"{value} = []",
+                "for _ in range(size):",
+                f"    element, offset = {parse}(view, offset)",
+                f"    {value}.append(element)",
+            )
+        elif shape is not None and isModel(nested):
+            parse = source.name("_parse", nested._parser(target))
+            source.add(4, f"{value}, offset = {parse}(view, offset)")
+        else:
+            parse = source.name("_parse", impl.parseWithSize)
+            source.add(
+                4, f"{value}, size = {parse}(view[offset:])", "offset += size"
+            )
+            _convert(source, model, key, value, shape)
+        fields.append((key, value))
+    result = _construct(source, model, fields, shape)
+    source.add(
+        4, "if state is not None:", "    state.exit()", f"return {result}, offset"
+    )
+    kind = "" if shape is None else f" as {shape.__name__}"
+    return source.compile("parse", f"<pynarist parse {model.__qualname__}{kind}>")
+
+
+def _convert(source: _Source, model: type, key: str, value: str, shape: Any) -> None:
+    # records parsed by the impl of a field, e.g. the members of a union,
+    # are converted afterwards
+    if shape is not None and holdsModels(model.fields[key]):
+        target = source.name("_target", nestedTarget(shape, key))
+        source.add(4, f"{value} = _convert({value}, {target})")
+        source.globals["_convert"] = convert
+
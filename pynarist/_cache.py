@@ -0,0 +1,60 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+"""
+An on-disk cache of the code generated for models, the `.pyc` files of
+their specialized build and parse functions. It is enabled by pointing
+`PYNARIST_CACHE_DIR` to a writable directory; calling `Model.compile()` on
+every model ahead of time, e.g. when a worker image is built, fills it.
+
+Entries are keyed by a hash of the generated source, so a changed model or
+a new pynarist version simply misses; the interpreter's cache tag keeps
+the marshal format of different Python versions apart.
+"""
+
+import marshal
+import os
+import sys
+from types import CodeType
+
+DIRECTORY = os.environ.get("PYNARIST_CACHE_DIR")
+
+
+def _path(directory: str, source: str, filename: str) -> str:
+    # imported on first use, as hashlib loads OpenSSL
+    from hashlib import blake2b
+
+    digest = blake2b(f"{filename}\0{source}".encode("utf-8"), digest_size=16)
+    return os.path.join(
+        directory, f"{digest.hexdigest()}.{sys.implementation.cache_tag}.code"
+    )
+
+
+def compileCached(source: str, filename: str) -> CodeType:
+    """
+    `compile(source, filename, "exec")`, through the cache when enabled.
+    """
+    directory = DIRECTORY
+    if not directory:
+        return compile(source, filename, "exec")
+
+    path = _path(directory, source, filename)
+    try:
+        with open(path, "rb") as file:
+            return marshal.loads(file.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        pass  # missing or unreadable; compile it again
+
+    code = compile(source, filename, "exec")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temporary, "wb") as file:
+            file.write(marshal.dumps(code))
+        # atomic, so concurrent workers never read a partial entry
+        os.replace(temporary, path)
+    except OSError:
+        # a read-only cache still works, it just never fills
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    return code
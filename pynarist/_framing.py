@@ -0,0 +1,209 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+"""
+Length-prefixed messages over stream sockets.
+
+Every message is a record prefixed with its length. Records are sent with
+`socket.sendmsg()` over the chunks `Model.buildTo()` writes, so nothing is
+concatenated, and received with `socket.recv_into()` into buffers taken
+from a `BufferPool`.
+"""
+
+import struct
+from typing import TYPE_CHECKING, Any
+
+from pynarist._errors import ParseError
+from pynarist._limits import ParseLimits
+
+if TYPE_CHECKING:
+    # only for annotations, as `socket` is slow to import
+    import socket
+
+# the length that prefixes every message
+MESSAGE_HEADER = struct.Struct("<I")
+# writes shorter than this are coalesced into one chunk
+COALESCE_SIZE = 1024
+# the most buffers a single `sendmsg()` call takes on common platforms
+IOV_MAX = 1024
+
+
+class BufferPool:
+    """
+    Reusable receive buffers. A buffer still referenced by a memoryview
+    when it is released, e.g. by a `blob` field of a parsed record, is left
+    to the garbage collector instead of being handed out again.
+    """
+
+    __slots__ = ("size", "capacity", "buffers")
+
+    def __init__(self, size: int = 65536, capacity: int = 16) -> None:
+        self.size = size
+        self.capacity = capacity
+        self.buffers: list[bytearray] = []
+
+    def acquire(self, size: int) -> bytearray:
+        """
+        A buffer of at least `size` bytes.
+        """
+        buffers = self.buffers
+        for index in range(len(buffers) - 1, -1, -1):
+            if len(buffers[index]) >= size:
+                return buffers.pop(index)
+        return bytearray(max(size, self.size))
+
+    def release(self, buffer: bytearray) -> None:
+        try:
+            # resizing fails while any memoryview of the buffer is alive
+            buffer.append(0)
+            buffer.pop()
+        except BufferError:
+            return
+        if len(self.buffers) < self.capacity:
+            self.buffers.append(buffer)
+
+
+class _Chunks:
+    """A write-only stream collecting the chunks of a message."""
+
+    __slots__ = ("chunks", "small", "size")
+
+    def __init__(self) -> None:
+        self.chunks: list = []
+        self.small = bytearray()
+        self.size = 0
+
+    def write(self, data: Any) -> None:
+        size = len(data)
+        self.size += size
+        if size < COALESCE_SIZE:
+            self.small += data
+            return
+        if self.small:
+            self.chunks.append(self.small)
+            self.small = bytearray()
+        self.chunks.append(data)
+
+    def seekable(self) -> bool:
+        return False
+
+    def finish(self) -> list:
+        if self.small:
+            self.chunks.append(self.small)
+        return self.chunks
+
+
+def sendAll(sock: "socket.socket", buffers: list) -> None:
+    """
+    Send every buffer, in order, without joining them when the platform
+    has `sendmsg()`.
+    """
+    if not hasattr(sock, "sendmsg"):
+        sock.sendall(b"".join(buffers))
+        return
+
+    views = [memoryview(buffer) for buffer in buffers if len(buffer)]
+    index = 0
+    while index < len(views):
+        sent = sock.sendmsg(views[index : index + IOV_MAX])
+        # skip what was sent, keeping the rest of a partly sent buffer
+        while sent and sent >= len(views[index]):
+            sent -= len(views[index])
+            index += 1
+        if sent:
+            views[index] = views[index][sent:]
+
+
+class FramedSocket:
+    """
+    Sends and receives records of `model` over a connected stream socket,
+    each prefixed with its length.
+
+    Messages longer than `maxLength` bytes are refused before anything is
+    allocated for them, and `limits` applies to every received record. As
+    the body of a refused message is left unread, the socket fails every
+    later `receive()` after that.
+    Fields parsed as memoryviews (`blob`, `fixedbytes`, `undecoded`) refer
+    to the receive buffer, which is only reused once they are gone.
+    """
+
+    __slots__ = ("socket", "model", "pool", "limits", "maxLength", "_header", "_error")
+
+    def __init__(
+        self,
+        sock: "socket.socket",
+        model: type,
+        pool: BufferPool | None = None,
+        limits: ParseLimits | None = None,
+        maxLength: int = 64 * 1024 * 1024,
+    ) -> None:
+        self.socket = sock
+        self.model = model
+        self.pool = BufferPool() if pool is None else pool
+        self.limits = limits
+        self.maxLength = maxLength
+        self._header = bytearray(MESSAGE_HEADER.size)
+        self._error: Exception | None = None
+
+    def send(self, record: Any) -> None:
+        chunks = _Chunks()
+        record.buildTo(chunks)
+        sendAll(self.socket, [MESSAGE_HEADER.pack(chunks.size), *chunks.finish()])
+
+    def receive(self) -> Any:
+        """
+        The next record, or `None` once the peer closed the connection.
+        """
+        if self._error is not None:
+            raise ParseError.new(
+                "the socket failed on an earlier message",
+                "the stream cannot be resynchronized; open a new connection",
+            ) from self._error
+        with memoryview(self._header) as header:
+            if not self._receiveInto(header, True):
+                return None
+        length = MESSAGE_HEADER.unpack(self._header)[0]
+        if length > self.maxLength:
+            self._error = ParseError.new(
+                f"message length {length} exceeds the limit of {self.maxLength}"
+            )
+            raise self._error
+
+        buffer = self.pool.acquire(length)
+        try:
+            with memoryview(buffer) as view:
+                self._receiveInto(view[:length], False)
+                record, size = self.model.parseWithSize(view[:length], self.limits)
+        finally:
+            self.pool.release(buffer)
+        if size != length:
+            raise ParseError.new(
+                f"message of {length} bytes holds a record of {size} bytes"
+            )
+        return record
+
+    def _receiveInto(self, view: memoryview, atBoundary: bool) -> bool:
+        # fill `view`; False when the connection ends before its first byte
+        # at a message boundary
+        received = 0
+        while received < len(view):
+            size = self.socket.recv_into(view[received:])
+            if not size:
+                if atBoundary and not received:
+                    return False
+                raise ParseError.new("connection closed in the middle of a message")
+            received += size
+        return True
+
+    def close(self) -> None:
+        self.socket.close()
+
+    def __enter__(self) -> "FramedSocket":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __iter__(self):
+        while (record := self.receive()) is not None:
+            yield record
@@ -1,15 +1,24 @@
 # Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
 # for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
 
+import copy
+import io
+import itertools
 import struct
-from typing import Any, Protocol
+import sys
+from typing import Any, BinaryIO, Callable, Generator, Protocol
 from collections import UserList, UserString
 
-from pynarist._errors import UsageError
+from pynarist._errors import BuildError, ParseError, UsageError
+from pynarist._limits import activeLimits
 from functools import lru_cache
 
 MISSING = object()
 
+# struct byte order prefixes accepted for models and `endian` fields; "="
+# (native order, no alignment) is the default
+BYTEORDERS = ("@", "=", "<", ">", "!")
+
 
 def registerImpl(source: type, impl: "Implementation"):
     if not isinstance(source, type):
@@ -23,21 +32,28 @@ def _format_class_name(cls):
 
 
 @lru_cache(maxsize=128)
-def getImpl(source) -> "Implementation":
+def getImpl(source, byteorder: str = "=") -> "Implementation":
     if not isinstance(source, type):
         raise UsageError.new("getImpl() argument 1 source must be a type")
 
-    if hasattr(source, "__pynarist_redirect__"):
-        impl = __pynarist_impls__[source.__pynarist_redirect__]
-        impl.__pynarist_redirector__ = source
-        return impl
-
-    if source not in __pynarist_impls__:
+    redirect = getattr(source, "__pynarist_redirect__", None)
+    key = source if redirect is None else redirect
+    if key not in __pynarist_impls__:
         raise NotImplementedError(
             f"No implementation found for class `{_format_class_name(source)}'"
         )
 
-    return __pynarist_impls__[source]
+    impl = __pynarist_impls__[key]
+    if byteorder != "=" and hasattr(impl, "withByteOrder"):
+        impl = impl.withByteOrder(byteorder)  # type: ignore
+    elif redirect is not None:
+        impl = copy.copy(impl)
+
+    if redirect is not None:
+        # every parametrized type gets its own impl instance, so that nested
+        # or suspended (incremental) parses never see another redirector
+        impl.__pynarist_redirector__ = source
+    return impl
 
 
 __pynarist_impls__: dict[type, "Implementation"] = {}
@@ -122,6 +138,30 @@ class fixedstring(UserString):
         return Subclass
 
 
+class blob:
+    """
+    Raw bytes prefixed with their length. Any object supporting the buffer
+    protocol can be built; parsing returns a memoryview of the input.
+    """
+
+
+class fixedbytes:
+    """
+    Raw bytes of a fixed length, e.g. `fixedbytes[16]`. Any object
+    supporting the buffer protocol can be built; parsing returns a
+    memoryview of the input.
+    """
+
+    TYPE_LENGTH = MISSING
+
+    def __class_getitem__(cls, length: int) -> type:
+        class Subclass(cls):
+            TYPE_LENGTH = length
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
 class array(UserList):
     """
     A fixed-length array.
@@ -180,6 +220,240 @@ class vector(UserList):
         return Subclass
 
 
+class chunked(UserList):
+    """
+    A variable-length array written as count-prefixed chunks and terminated
+    by an empty chunk, so that it can be built from an iterator of unknown
+    length straight into a non-seekable stream.
+    """
+
+    TYPE_ELEMENT = MISSING
+    CHUNK_LENGTH = 1024
+
+    def __init__(self, *seq: object) -> None:
+        super().__init__(seq)
+        if not all(isinstance(x, self.TYPE_ELEMENT) for x in self.data):  # type: ignore
+            raise UsageError.new(
+                f"chunked data element type {self.TYPE_ELEMENT} not matched"
+            )
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class endian:
+    """
+    Overrides the byte order of a single field, e.g. `endian[int, ">"]`.
+    """
+
+    TYPE_ELEMENT = MISSING
+    BYTEORDER = MISSING
+
+    def __class_getitem__(cls, args: tuple[type, str]) -> type:
+        dtype, byteorder = args
+        if byteorder not in BYTEORDERS:
+            raise UsageError.new(
+                f"unknown byte order {byteorder!r}; use one of {', '.join(BYTEORDERS)}"
+            )
+
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            BYTEORDER = byteorder
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class optional:
+    """
+    A value that may be `None`, e.g. `optional[int]`. In a model, absent
+    fields are only marked in the presence bitmap at the front of the
+    record; elsewhere the value is prefixed with a presence byte.
+    """
+
+    TYPE_ELEMENT = MISSING
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class since:
+    """
+    A field of a versioned model that was appended in a later version,
+    e.g. `since[long, 2]`. Records of older writers do not hold it, and
+    parse with the field's default, the class attribute of the same name.
+    """
+
+    TYPE_ELEMENT = MISSING
+    VERSION = MISSING
+
+    def __class_getitem__(cls, args: tuple[type, int]) -> type:
+        dtype, version = args
+        if not isinstance(version, int) or version < 1:
+            raise UsageError.new("since[...] version must be a positive integer")
+
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            VERSION = version
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class deprecated:
+    """
+    A model field that is no longer used, e.g. `deprecated[short]`. It
+    keeps its place in the record, so that older readers still line up,
+    and is written as its default; parsing skips it without decoding.
+    """
+
+    TYPE_ELEMENT = MISSING
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class union:
+    """
+    A value of one of several types, e.g. `union[Request, Response]`,
+    encoded as the index of its type followed by the value.
+    """
+
+    TYPE_MEMBERS = MISSING
+
+    def __class_getitem__(cls, members: tuple[type, ...]) -> type:
+        if not isinstance(members, tuple):
+            members = (members,)
+        if not 0 < len(members) <= 65536:
+            raise UsageError.new("union must have between 1 and 65536 members")
+
+        class Subclass(cls):
+            TYPE_MEMBERS = members
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class delta:
+    """
+    A `vector` or `array` of integers written as the zigzag varints of the
+    differences between neighbouring elements, e.g. `delta[vector[long]]`.
+    Sorted or slowly changing sequences such as timestamps and offsets
+    shrink to one or two bytes per element.
+    """
+
+    TYPE_ELEMENT = MISSING
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        if getattr(dtype, "__pynarist_redirect__", None) not in (vector, array):
+            raise UsageError.new("delta[...] takes a vector[...] or array[...] type")
+        if dtype.TYPE_ELEMENT not in (long, int, short, byte):  # type: ignore
+            raise UsageError.new(
+                "delta[...] elements must be one of long, int, short or byte"
+            )
+
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class bits(int):
+    """
+    A flag for unsigned integers of `width` bits, e.g. `bits[3]`. Alone it
+    takes whole bytes; in `packed[...]` it takes exactly `width` bits.
+    """
+
+    TYPE_WIDTH = MISSING
+
+    def __class_getitem__(cls, width: int) -> type:
+        if not 0 < width <= 64:
+            raise UsageError.new("bits[...] width must be between 1 and 64")
+
+        class Subclass(cls):
+            TYPE_WIDTH = width
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class packed:
+    """
+    A `vector` or `array` of `bool` or `bits[...]` with its elements packed
+    into consecutive bits, e.g. `packed[vector[bool]]`. Element `i` takes
+    the bits `i * width` onwards of a little-endian integer.
+    """
+
+    TYPE_ELEMENT = MISSING
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        if getattr(dtype, "__pynarist_redirect__", None) not in (vector, array):
+            raise UsageError.new("packed[...] takes a vector[...] or array[...] type")
+        element = dtype.TYPE_ELEMENT  # type: ignore
+        if element is not bool and getattr(element, "__pynarist_redirect__", None) is not bits:
+            raise UsageError.new("packed[...] elements must be bool or bits[...]")
+
+        class Subclass(cls):
+            TYPE_ELEMENT = dtype
+            __pynarist_redirect__ = cls
+
+        return Subclass
+
+
+class interned:
+    """
+    A string decoded through a shared, bounded cache keyed on its bytes, so
+    that repeated short strings are decoded once and share one object,
+    e.g. `interned[varchar]`.
+    """
+
+    TYPE_ELEMENT = MISSING
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        return _textMode(cls, dtype)
+
+
+class undecoded:
+    """
+    A string parsed as the bytes of its UTF-8 text instead of a `str`, for
+    fields that are only passed along, e.g. `undecoded[str]`. Parsing a
+    model returns a memoryview of the input.
+    """
+
+    TYPE_ELEMENT = MISSING
+
+    def __class_getitem__(cls, dtype: type) -> type:
+        return _textMode(cls, dtype)
+
+
+def _textMode(cls: type, dtype: type) -> type:
+    if dtype not in (str, char, varchar) and getattr(
+        dtype, "__pynarist_redirect__", None
+    ) is not fixedstring:
+        raise UsageError.new(
+            f"{cls.__name__}[...] takes one of str, char, varchar or fixedstring[...]"
+        )
+
+    class Subclass(cls):
+        TYPE_ELEMENT = dtype
+        __pynarist_redirect__ = cls
+
+    return Subclass
+
+
 class null:
     pass
 
@@ -195,6 +469,144 @@ class Implementation(Protocol):
     def build(self, source: Any) -> bytes: ...
     def parse(self, source: bytes) -> Any: ...
     def parseWithSize(self, source: bytes) -> tuple[Any, int]: ...
+    def parseStream(self) -> "ParseStream": ...
+    def minSize(self) -> int: ...
+
+
+# An incremental parse: yields the number of bytes it needs next, is sent
+# exactly that many bytes, and returns the parsed value.
+ParseStream = Generator[int, bytes, Any]
+
+
+def minSize(impl: Implementation) -> int:
+    """
+    The smallest encoded size of a value of `impl`, 0 for impls registered
+    without `minSize()`.
+    """
+    method = getattr(impl, "minSize", None)
+    return 0 if method is None else method()
+
+
+# the most elements of zero width, which the input size cannot bound, that
+# a sequence may have beyond the number of bytes left
+ZERO_WIDTH_LENGTH = 4096
+
+
+def checkLength(
+    length: int, element: Implementation, remaining: int | None, decoded: int = 0
+) -> None:
+    """
+    Validate a decoded sequence length before anything is allocated for it.
+    `remaining` is the number of bytes left for the elements, if known, and
+    `decoded` the number of elements of the same sequence already parsed.
+    """
+    width = minSize(element)
+    if width:
+        if remaining is not None and length * width > remaining:
+            raise ParseError.new(
+                f"sequence length {length} does not fit in the {remaining} bytes left"
+            )
+    elif length > ZERO_WIDTH_LENGTH and (remaining is None or length > remaining):
+        raise ParseError.new(
+            f"sequence length {length} of zero-width elements exceeds {ZERO_WIDTH_LENGTH}"
+        )
+    state = activeLimits.get()
+    if state is not None:
+        state.addLength(length, decoded)
+
+
+def checkString(length: int, remaining: int | None) -> None:
+    """
+    Validate a decoded string length before the string is decoded.
+    """
+    if remaining is not None and length > remaining:
+        raise ParseError.new(
+            f"string length {length} does not fit in the {remaining} bytes left"
+        )
+    state = activeLimits.get()
+    if state is not None:
+        state.addString(length)
+
+
+def checkSkip(size: int, source: bytes) -> int:
+    """
+    Validate the size of a value read by `skip()` against the bytes left.
+    """
+    if size > len(source):
+        raise ParseError.new(
+            f"value of {size} bytes does not fit in the {len(source)} bytes left"
+        )
+    return size
+
+
+# longer strings are decoded straight from a memoryview instead of a copy
+TEXT_COPY_LIMIT = 4096
+# the strings `interned[...]` caches, and the longest one it caches
+INTERN_CACHE_SIZE = 4096
+INTERN_MAX_LENGTH = 64
+
+
+def decodeText(raw: bytes | memoryview) -> str:
+    """
+    Decode UTF-8 text. `bytes.decode()` avoids the codec lookup of
+    `str(raw, "utf-8")` and goes straight to the decoder's ASCII fast path.
+    """
+    if type(raw) is memoryview:
+        if len(raw) > TEXT_COPY_LIMIT:
+            return str(raw, "utf-8")
+        raw = raw.tobytes()
+    return raw.decode()  # type: ignore
+
+
+@lru_cache(maxsize=INTERN_CACHE_SIZE)
+def _intern(raw: bytes) -> str:
+    return raw.decode()
+
+
+def internText(raw: bytes | memoryview) -> str:
+    """
+    Decode UTF-8 text, sharing the result for repeated short strings.
+    """
+    if len(raw) > INTERN_MAX_LENGTH:
+        return decodeText(raw)
+    return _intern(raw.tobytes() if type(raw) is memoryview else bytes(raw))
+
+
+def rawText(raw: bytes | memoryview) -> bytes | memoryview:
+    """
+    Leave UTF-8 text undecoded.
+    """
+    return raw
+
+
+def bulkFormat(element: Implementation, byteorder: str, length: int) -> str | None:
+    """
+    The struct format packing `length` elements at once, if the element impl
+    is a single struct code.
+    """
+    code = getattr(element, "CODE", None)
+    return None if code is None else f"{byteorder}{length}{code}"
+
+
+def buildTo(impl: Implementation, source: Any, stream: BinaryIO) -> None:
+    """
+    Write `source` to `stream` with `impl`, streaming it when the impl
+    supports that and building it in memory otherwise.
+    """
+    if hasattr(impl, "buildTo"):
+        impl.buildTo(source, stream)  # type: ignore
+    else:
+        stream.write(impl.build(source))
+
+
+def skip(impl: Implementation, source: bytes) -> int:
+    """
+    The size of the value `impl` encoded at the start of `source`, read
+    without decoding the value when the impl supports that.
+    """
+    if hasattr(impl, "skip"):
+        return impl.skip(source)  # type: ignore
+    return impl.parseWithSize(source)[1]
 
 
 class ImplNull:
@@ -210,6 +622,13 @@ class ImplNull:
     def parseWithSize(self, source: bytes) -> tuple[None, int]:
         return None, 1
 
+    def parseStream(self) -> ParseStream:
+        yield 1
+        return None
+
+    def minSize(self) -> int:
+        return 1
+
 
 class ImplIgnore:
     __slots__ = ('__pynarist_redirector__',)
@@ -224,158 +643,360 @@ class ImplIgnore:
     def parseWithSize(self, source: bytes) -> tuple[None, int]:
         return None, len(source)  # ignore all bytes after
 
+    def parseStream(self) -> ParseStream:
+        raise UsageError.new("ignore cannot be parsed incrementally")
+        yield
+
+    def minSize(self) -> int:
+        return 0
+
 
 class ImplInt:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: int
+    CODE = "i"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplInt":
+        return type(self)(byteorder)
 
     def build(self, source: int):
         if source.bit_length() > 32:
             raise UsageError.new(
                 "Integer too large to be packed into 4 bytes. Use the long() flag"
             )
-        return struct.pack("i", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> int:
-        return struct.unpack_from("i", source)[0]
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[int, int]:
-        return struct.unpack_from("i", source)[0], 4
+        return self.format.unpack_from(source)[0], 4
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 4))
+
+    def minSize(self) -> int:
+        return 4
 
 
 class ImplLong:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: long
+    CODE = "q"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplLong":
+        return type(self)(byteorder)
 
     def build(self, source: long):
         if source.bit_length() > 64:
             raise UsageError.new(
                 "Long integer too large to be packed into 8 bytes. Use the int() flag"
             )
-        return struct.pack("q", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> int:
-        return int(struct.unpack_from("q", source)[0])
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[int, int]:
-        return int(struct.unpack_from("q", source)[0]), 8
+        return self.format.unpack_from(source)[0], 8
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 8))
+
+    def minSize(self) -> int:
+        return 8
 
 
 class ImplShort:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: short
+    CODE = "h"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplShort":
+        return type(self)(byteorder)
 
     def build(self, source: short):
         if source.bit_length() > 16:
             raise UsageError.new(
                 "Short integer too large to be packed into 2 bytes. Use the int() flag"
             )
-        return struct.pack("h", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes):
-        return int(struct.unpack_from("h", source)[0])
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[int, int]:
-        return int(struct.unpack_from("h", source)[0]), 2
+        return self.format.unpack_from(source)[0], 2
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 2))
+
+    def minSize(self) -> int:
+        return 2
 
 
 class ImplByte:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: byte
+    CODE = "b"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplByte":
+        return type(self)(byteorder)
 
     def build(self, source: byte):
         if source.bit_length() > 8:
             raise UsageError.new("Byte integer too large to be packed into 1 byte.")
-        return struct.pack("b", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> int:
-        return int(struct.unpack_from("b", source)[0])
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[int, int]:
-        return int(struct.unpack_from("b", source)[0]), 1
+        return self.format.unpack_from(source)[0], 1
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 1))
+
+    def minSize(self) -> int:
+        return 1
 
 
 class ImplHalf:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: half
+    CODE = "e"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplHalf":
+        return type(self)(byteorder)
 
     def build(self, source: half):
-        return struct.pack("e", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> float:
-        return struct.unpack_from("e", source)[0]
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[float, int]:
-        return struct.unpack_from("e", source)[0], 2
+        return self.format.unpack_from(source)[0], 2
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 2))
+
+    def minSize(self) -> int:
+        return 2
 
 
 class ImplFloat:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: float
+    CODE = "f"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplFloat":
+        return type(self)(byteorder)
 
     def build(self, source: float):
-        return struct.pack("f", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> float:
-        return struct.unpack_from("f", source)[0]
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[float, int]:
-        return struct.unpack_from("f", source)[0], 4
+        return self.format.unpack_from(source)[0], 4
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 4))
+
+    def minSize(self) -> int:
+        return 4
 
 
 class ImplDouble:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: double
+    CODE = "d"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplDouble":
+        return type(self)(byteorder)
 
     def build(self, source: double):
-        return struct.pack("d", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> float:
-        return struct.unpack_from("d", source)[0]
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[float, int]:
-        return struct.unpack_from("d", source)[0], 8
+        return self.format.unpack_from(source)[0], 8
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 8))
+
+    def minSize(self) -> int:
+        return 8
 
 
 class ImplFixedString:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'decode')
     __pynarist_redirector__: fixedstring
 
+    def __init__(self) -> None:
+        self.decode = decodeText
+
     def build(self, source: fixedstring):
         return source.data.encode("utf-8")
 
     def parse(self, source: bytes) -> str:
-        length = self.__pynarist_redirector__.TYPE_LENGTH
-        return str(source[:length].decode("utf-8"))
+        return self.parseWithSize(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[str, int]:
         length = self.__pynarist_redirector__.TYPE_LENGTH
-        return str(source[:length].decode("utf-8")), length  # type: ignore
+        checkString(length, len(source))  # type: ignore
+        return self.decode(source[:length]), length  # type: ignore
 
+    def skip(self, source: bytes) -> int:
+        return checkSkip(self.__pynarist_redirector__.TYPE_LENGTH, source)  # type: ignore
 
-class ImplArray:
+    def parseStream(self) -> ParseStream:
+        length = self.__pynarist_redirector__.TYPE_LENGTH
+        checkString(length, None)  # type: ignore
+        return self.decode((yield length))  # type: ignore
+
+    def minSize(self) -> int:
+        return self.__pynarist_redirector__.TYPE_LENGTH  # type: ignore
+
+
+class ImplBlob:
+    __slots__ = ('__pynarist_redirector__', 'prefix')
+    __pynarist_redirector__: blob
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.prefix = struct.Struct(byteorder + "I")
+
+    def withByteOrder(self, byteorder: str) -> "ImplBlob":
+        return type(self)(byteorder)
+
+    def build(self, source: Any) -> bytes:
+        view = memoryview(source).cast("B")
+        return self.prefix.pack(len(view)) + view
+
+    def buildTo(self, source: Any, stream: BinaryIO) -> None:
+        view = memoryview(source).cast("B")
+        stream.write(self.prefix.pack(len(view)))
+        stream.write(view)
+
+    def parse(self, source: bytes) -> memoryview:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[memoryview, int]:
+        length = self.prefix.unpack_from(source)[0]
+        checkString(length, len(source) - 4)
+        return memoryview(source)[4 : 4 + length], 4 + length
+
+    def parseStream(self) -> ParseStream:
+        length = self.prefix.unpack((yield 4))[0]
+        checkString(length, None)
+        return memoryview((yield length) if length else b"")
+
+    def skip(self, source: bytes) -> int:
+        return checkSkip(4 + self.prefix.unpack_from(source)[0], source)
+
+    def minSize(self) -> int:
+        return 4
+
+
+class ImplFixedBytes:
     __slots__ = ('__pynarist_redirector__',)
+    __pynarist_redirector__: fixedbytes
+
+    def _view(self, source: Any) -> memoryview:
+        view = memoryview(source).cast("B")
+        length = self.__pynarist_redirector__.TYPE_LENGTH
+        if len(view) != length:
+            raise UsageError.new(
+                f"fixed bytes data length {len(view)} and type length {length} not matched"
+            )
+        return view
+
+    def build(self, source: Any) -> bytes:
+        return bytes(self._view(source))
+
+    def buildTo(self, source: Any, stream: BinaryIO) -> None:
+        stream.write(self._view(source))
+
+    def parse(self, source: bytes) -> memoryview:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[memoryview, int]:
+        length = self.__pynarist_redirector__.TYPE_LENGTH
+        checkString(length, len(source))  # type: ignore
+        return memoryview(source)[:length], length  # type: ignore
+
+    def parseStream(self) -> ParseStream:
+        length = self.__pynarist_redirector__.TYPE_LENGTH
+        checkString(length, None)  # type: ignore
+        return memoryview((yield length) if length else b"")  # type: ignore
+
+    def skip(self, source: bytes) -> int:
+        return checkSkip(self.__pynarist_redirector__.TYPE_LENGTH, source)  # type: ignore
+
+    def minSize(self) -> int:
+        return self.__pynarist_redirector__.TYPE_LENGTH  # type: ignore
+
+
+class ImplArray:
+    __slots__ = ('__pynarist_redirector__', 'byteorder')
     __pynarist_redirector__: array
 
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = byteorder
+
+    def withByteOrder(self, byteorder: str) -> "ImplArray":
+        return type(self)(byteorder)
+
     def build(self, source: array) -> bytes:
-        return b"".join(
-            getImpl(self.__pynarist_redirector__.TYPE_ELEMENT).build(x) for x in source
-        )
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        bulk = bulkFormat(element_impl, self.byteorder, len(source))
+        if bulk is not None:
+            try:
+                return struct.pack(bulk, *source)
+            except struct.error:
+                pass  # build one by one for the error of the element impl
+        return b"".join(element_impl.build(x) for x in source)
+
+    def buildTo(self, source: array, stream: BinaryIO) -> None:
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        for x in source:
+            buildTo(element_impl, x, stream)
 
     def parse(self, source: bytes) -> list:
-        length = self.__pynarist_redirector__.TYPE_LENGTH
-        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT)
-        result = []
-        offset = 0
-        for _ in range(length): # type: ignore
-            element, size = element_impl.parseWithSize(source[offset:])
-            result.append(element)
-            offset += size
-        return result
+        return self.parseWithSize(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[list, int]:
         length = self.__pynarist_redirector__.TYPE_LENGTH
-        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT)
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        checkLength(length, element_impl, len(source))  # type: ignore
+        bulk = bulkFormat(element_impl, self.byteorder, length)  # type: ignore
+        if bulk is not None:
+            return list(struct.unpack_from(bulk, source)), struct.calcsize(bulk)
         result = []
         offset = 0
         for _ in range(length):  # type: ignore
@@ -384,101 +1005,914 @@ class ImplArray:
             offset += size
         return result, offset
 
+    def parseStream(self) -> ParseStream:
+        length = self.__pynarist_redirector__.TYPE_LENGTH
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        checkLength(length, element_impl, None)  # type: ignore
+        bulk = bulkFormat(element_impl, self.byteorder, length)  # type: ignore
+        if bulk is not None:
+            return list(struct.unpack(bulk, (yield struct.calcsize(bulk))))
+        result = []
+        for _ in range(length):  # type: ignore
+            result.append((yield from element_impl.parseStream()))
+        return result
+
+    def minSize(self) -> int:
+        redirector = self.__pynarist_redirector__
+        element_impl = getImpl(redirector.TYPE_ELEMENT, self.byteorder)
+        return redirector.TYPE_LENGTH * minSize(element_impl)  # type: ignore
+
 
 class ImplVector:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'byteorder', 'prefix')
     __pynarist_redirector__: vector
 
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = byteorder
+        self.prefix = struct.Struct(byteorder + "I")
+
+    def withByteOrder(self, byteorder: str) -> "ImplVector":
+        return type(self)(byteorder)
+
     def build(self, source: vector) -> bytes:
-        encoded = b"".join(
-            getImpl(self.__pynarist_redirector__.TYPE_ELEMENT).build(x) for x in source
-        )
-        return struct.pack("I", len(source)) + encoded
+        if not hasattr(source, "__len__"):
+            source = list(source)  # type: ignore
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        bulk = bulkFormat(element_impl, self.byteorder, len(source))
+        if bulk is not None:
+            try:
+                return self.prefix.pack(len(source)) + struct.pack(bulk, *source)
+            except struct.error:
+                pass  # build one by one for the error of the element impl
+        encoded = b"".join(element_impl.build(x) for x in source)
+        return self.prefix.pack(len(source)) + encoded
+
+    def buildTo(self, source: vector, stream: BinaryIO) -> None:
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        if hasattr(source, "__len__"):
+            stream.write(self.prefix.pack(len(source)))
+            for x in source:
+                buildTo(element_impl, x, stream)
+            return
+
+        # the length of an iterator is only known at its end, so reserve the
+        # prefix and patch it afterwards
+        if not stream.seekable():
+            raise BuildError.new(
+                "cannot stream an iterator into a vector on a non-seekable output",
+                "use chunked[...] for the field instead",
+            )
+        start = stream.tell()
+        stream.write(b"\x00\x00\x00\x00")
+        length = 0
+        for x in source:
+            buildTo(element_impl, x, stream)
+            length += 1
+        end = stream.tell()
+        stream.seek(start)
+        stream.write(self.prefix.pack(length))
+        stream.seek(end)
 
     def parse(self, source: bytes) -> list:
-        length = struct.unpack_from("I", source)[0]
-        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT)
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[list, int]:
+        length = self.prefix.unpack_from(source)[0]
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        checkLength(length, element_impl, len(source) - 4)
+        bulk = bulkFormat(element_impl, self.byteorder, length)
+        if bulk is not None:
+            return list(struct.unpack_from(bulk, source, 4)), 4 + struct.calcsize(bulk)
         result = []
         offset = 4
         for _ in range(length):
             element, size = element_impl.parseWithSize(source[offset:])
             result.append(element)
             offset += size
+        return result, offset
+
+    def skip(self, source: bytes) -> int:
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        length = self.prefix.unpack_from(source)[0]
+        checkLength(length, element_impl, len(source) - 4)
+        if hasattr(element_impl, "CODE"):
+            return 4 + length * element_impl.minSize()
+        offset = 4
+        for _ in range(length):
+            offset += skip(element_impl, source[offset:])
+        return offset
+
+    def parseStream(self) -> ParseStream:
+        length = self.prefix.unpack((yield 4))[0]
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        checkLength(length, element_impl, None)
+        bulk = bulkFormat(element_impl, self.byteorder, length)
+        if bulk is not None:
+            return list(struct.unpack(bulk, (yield struct.calcsize(bulk))))
+        result = []
+        for _ in range(length):
+            result.append((yield from element_impl.parseStream()))
         return result
 
+    def minSize(self) -> int:
+        return 4
+
+
+class ImplChunked:
+    __slots__ = ('__pynarist_redirector__', 'byteorder', 'prefix')
+    __pynarist_redirector__: chunked
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = byteorder
+        self.prefix = struct.Struct(byteorder + "I")
+
+    def withByteOrder(self, byteorder: str) -> "ImplChunked":
+        return type(self)(byteorder)
+
+    def build(self, source: chunked) -> bytes:
+        stream = io.BytesIO()
+        self.buildTo(source, stream)
+        return stream.getvalue()
+
+    def buildTo(self, source: chunked, stream: BinaryIO) -> None:
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        chunk_length = self.__pynarist_redirector__.CHUNK_LENGTH
+        chunk = []
+        for x in source:
+            chunk.append(element_impl.build(x))
+            if len(chunk) == chunk_length:
+                stream.write(self.prefix.pack(len(chunk)) + b"".join(chunk))
+                chunk.clear()
+        if chunk:
+            stream.write(self.prefix.pack(len(chunk)) + b"".join(chunk))
+        stream.write(b"\x00\x00\x00\x00")
+
+    def parse(self, source: bytes) -> list:
+        return self.parseWithSize(source)[0]
+
     def parseWithSize(self, source: bytes) -> tuple[list, int]:
-        length = struct.unpack_from("I", source)[0]
-        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT)
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
         result = []
-        offset = 4
-        for _ in range(length):
-            print(_)
-            element, size = element_impl.parseWithSize(source[offset:])
-            result.append(element)
-            offset += size
-        return result, offset
+        offset = 0
+        while True:
+            length = self.prefix.unpack_from(source, offset)[0]
+            offset += 4
+            if not length:
+                return result, offset
+            checkLength(length, element_impl, len(source) - offset, len(result))
+            for _ in range(length):
+                element, size = element_impl.parseWithSize(source[offset:])
+                result.append(element)
+                offset += size
+
+    def parseStream(self) -> ParseStream:
+        element_impl = getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+        result = []
+        while length := self.prefix.unpack((yield 4))[0]:
+            checkLength(length, element_impl, None, len(result))
+            for _ in range(length):
+                result.append((yield from element_impl.parseStream()))
+        return result
 
+    def minSize(self) -> int:
+        return 4
 
-class ImplVarChar:
+
+# sequences at least this long are decoded with NumPy, when it is installed
+DELTA_NUMPY_THRESHOLD = 64
+
+_numpy: Any = MISSING
+
+
+def _importNumpy() -> Any:
+    # NumPy is optional and slow to import, so it is only looked up on the
+    # first long delta sequence
+    global _numpy
+    if _numpy is MISSING:
+        try:
+            import numpy as _numpy
+        except ImportError:
+            _numpy = None
+    return _numpy
+
+
+class ImplDelta:
+    __slots__ = ('__pynarist_redirector__', 'prefix')
+    __pynarist_redirector__: delta
+
+    BITS = {long: 64, int: 32, short: 16, byte: 8}
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.prefix = struct.Struct(byteorder + "I")
+
+    def withByteOrder(self, byteorder: str) -> "ImplDelta":
+        return type(self)(byteorder)
+
+    def _layout(self) -> tuple[int, int | None]:
+        # the element width in bits, and the length of an array (None for a
+        # vector, whose length is prefixed)
+        container = self.__pynarist_redirector__.TYPE_ELEMENT
+        bits = self.BITS[container.TYPE_ELEMENT]  # type: ignore
+        if container.__pynarist_redirect__ is vector:  # type: ignore
+            return bits, None
+        return bits, container.TYPE_LENGTH  # type: ignore
+
+    def build(self, source: Any) -> bytes:
+        if not hasattr(source, "__len__"):
+            source = list(source)
+        bits, length = self._layout()
+        if length is None:
+            result = bytearray(self.prefix.pack(len(source)))
+        elif len(source) != length:
+            raise UsageError.new(
+                f"array data length {len(source)} and type length {length} not matched"
+            )
+        else:
+            result = bytearray()
+
+        if source:
+            low = -(1 << (bits - 1))
+            if min(source) < low or max(source) > ~low:
+                raise UsageError.new(f"delta element does not fit in {bits} bits")
+        mask = (1 << bits) - 1
+        sign = bits - 1
+        append = result.append
+        previous = 0
+        for value in source:
+            # the difference wraps around like the fixed-width element would,
+            # so that zigzag keeps it within `bits`
+            difference = (value - previous) & mask
+            previous = value
+            encoded = ((difference << 1) & mask) ^ (mask if difference >> sign else 0)
+            while encoded > 0x7F:
+                append(encoded & 0x7F | 0x80)
+                encoded >>= 7
+            append(encoded)
+        return bytes(result)
+
+    def parse(self, source: bytes) -> list[int]:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[list[int], int]:
+        bits, length = self._layout()
+        offset = 0
+        if length is None:
+            length = self.prefix.unpack_from(source)[0]
+            offset = 4
+        # every delta takes at least one byte
+        checkLength(length, getImpl(byte), len(source) - offset)
+        if length >= DELTA_NUMPY_THRESHOLD:
+            numpy = _importNumpy()
+            if numpy is not None:
+                return _deltaNumpy(numpy, source, offset, length, bits)
+        deltas, end = _readDeltas(source, offset, length, bits)
+        return _prefixSum(deltas, bits), end
+
+    def parseStream(self) -> ParseStream:
+        bits, length = self._layout()
+        if length is None:
+            length = self.prefix.unpack((yield 4))[0]
+        checkLength(length, getImpl(byte), None)
+        # ask for one byte per delta that has not ended yet, which never reads
+        # past the last one
+        data = b""
+        ended = 0
+        while ended < length:
+            chunk = yield length - ended
+            ended += sum(1 for x in chunk if x < 0x80)
+            data += chunk
+        return _prefixSum(_readDeltas(data, 0, length, bits)[0], bits)
+
+    def minSize(self) -> int:
+        length = self._layout()[1]
+        return 4 if length is None else length
+
+
+def _readDeltas(
+    source: bytes, offset: int, length: int, bits: int
+) -> tuple[list[int], int]:
+    # decode `length` zigzag varints starting at `offset`
+    deltas = []
+    append = deltas.append
+    end = len(source)
+    for _ in range(length):
+        value = shift = 0
+        while True:
+            if offset >= end:
+                raise ParseError.new("delta sequence is truncated")
+            x = source[offset]
+            offset += 1
+            value |= (x & 0x7F) << shift
+            if x < 0x80:
+                break
+            shift += 7
+            if shift >= bits:
+                raise ParseError.new(f"delta does not fit in {bits} bits")
+        append((value >> 1) ^ -(value & 1))
+    return deltas, offset
+
+
+def _prefixSum(deltas: list[int], bits: int) -> list[int]:
+    values = list(itertools.accumulate(deltas))
+    low = -(1 << (bits - 1))
+    if values and (min(values) < low or max(values) > ~low):
+        # the encoder wrapped the differences around, so wrap the sums too
+        mask = (1 << bits) - 1
+        values = [((x - low) & mask) + low for x in values]
+    return values
+
+
+def _deltaNumpy(
+    numpy: Any, source: bytes, offset: int, length: int, bits: int
+) -> tuple[list[int], int]:
+    window = numpy.frombuffer(
+        source,
+        numpy.uint8,
+        min(len(source) - offset, length * ((bits + 6) // 7)),
+        offset,
+    )
+    ends = numpy.flatnonzero(window < 0x80)[:length]
+    if len(ends) < length:
+        raise ParseError.new("delta sequence is truncated")
+    size = int(ends[-1]) + 1
+    starts = numpy.concatenate(([0], ends[:-1] + 1))
+    # the position of every byte within its varint, from the start of the
+    # varint it belongs to
+    group = numpy.zeros(size, numpy.intp)
+    group[starts[1:]] = 1
+    shifts = (numpy.arange(size) - starts[numpy.cumsum(group)]) * 7
+    if int(shifts.max()) >= bits:
+        raise ParseError.new(f"delta does not fit in {bits} bits")
+    parts = (window[:size] & 0x7F).astype(numpy.uint64) << shifts.astype(numpy.uint64)
+    encoded = numpy.bitwise_or.reduceat(parts, starts)
+    deltas = (encoded >> numpy.uint64(1)).astype(numpy.int64) ^ -(
+        encoded & numpy.uint64(1)
+    ).astype(numpy.int64)
+    # int64 sums wrap like the encoder's differences; the cast to the element
+    # type wraps narrower elements
+    values = numpy.cumsum(deltas, dtype=numpy.int64).astype(f"int{bits}")
+    return values.tolist(), offset + size
+
+
+class ImplBits:
+    __slots__ = ('__pynarist_redirector__', 'byteorder')
+    __pynarist_redirector__: bits
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = _intByteOrder(byteorder)
+
+    def withByteOrder(self, byteorder: str) -> "ImplBits":
+        return type(self)(byteorder)
+
+    def build(self, source: int) -> bytes:
+        width = self.__pynarist_redirector__.TYPE_WIDTH
+        if not 0 <= source < 1 << width:  # type: ignore
+            raise UsageError.new(f"bits value {source} does not fit in {width} bits")
+        return source.to_bytes(self.minSize(), self.byteorder)
+
+    def parse(self, source: bytes) -> int:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[int, int]:
+        size = self.minSize()
+        if len(source) < size:
+            raise ParseError.new(f"bits value needs {size} bytes, got {len(source)}")
+        return int.from_bytes(source[:size], self.byteorder), size
+
+    def parseStream(self) -> ParseStream:
+        return int.from_bytes((yield self.minSize()), self.byteorder)
+
+    def minSize(self) -> int:
+        return (self.__pynarist_redirector__.TYPE_WIDTH + 7) // 8  # type: ignore
+
+
+def _intByteOrder(byteorder: str) -> str:
+    # the `int.to_bytes` order of a struct byte order prefix
+    if byteorder in "<>!":
+        return "little" if byteorder == "<" else "big"
+    return sys.byteorder
+
+
+# maps the bytes 0 and 1 to the digits "0" and "1", and back
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def packBits(values: Any, width: int) -> bytes:
+    """
+    Pack unsigned integers of `width` bits each, element `i` at bit
+    `i * width` of a little-endian integer.
+    """
+    size = (len(values) * width + 7) // 8
+    if not values:
+        return b""
+    if width == 1:
+        # each bool becomes one binary digit, most significant first
+        try:
+            digits = bytes(values)[::-1].translate(_TO_DIGITS)
+        except (TypeError, ValueError):
+            raise UsageError.new("packed bool elements must be 0 or 1") from None
+        if digits.strip(b"01"):
+            raise UsageError.new("packed bool elements must be 0 or 1")
+    else:
+        if min(values) < 0 or max(values) >> width:
+            raise UsageError.new(f"packed element does not fit in {width} bits")
+        digits = "".join(map(format, reversed(values), itertools.repeat(f"0{width}b")))
+    return int(digits, 2).to_bytes(size, "little")
+
+
+def unpackBits(source: bytes, length: int, width: int, flags: bool = False) -> list:
+    """
+    The inverse of `packBits()`; bools are returned when `flags` is set.
+    """
+    if not length:
+        return []
+    total = length * width
+    value = int.from_bytes(source[: (total + 7) // 8], "little") & ((1 << total) - 1)
+    digits = format(value, f"0{total}b").encode("ascii")
+    if width == 1:
+        raw = digits[::-1].translate(_FROM_DIGITS)
+        return list(struct.unpack(f"{length}?", raw)) if flags else list(raw)
+    import re
+
+    # split the digits in C, most significant first
+    chunks = re.findall(b"[01]{%d}" % width, digits)
+    result = list(map(int, chunks, itertools.repeat(2)))
+    result.reverse()
+    return result
+
+
+class ImplPacked:
+    __slots__ = ('__pynarist_redirector__', 'prefix')
+    __pynarist_redirector__: packed
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.prefix = struct.Struct(byteorder + "I")
+
+    def withByteOrder(self, byteorder: str) -> "ImplPacked":
+        return type(self)(byteorder)
+
+    def _layout(self) -> tuple[int, int | None]:
+        # the element width in bits, and the length of an array (None for a
+        # vector, whose length is prefixed)
+        container = self.__pynarist_redirector__.TYPE_ELEMENT
+        element = container.TYPE_ELEMENT  # type: ignore
+        width = 1 if element is bool else element.TYPE_WIDTH
+        if container.__pynarist_redirect__ is vector:  # type: ignore
+            return width, None
+        return width, container.TYPE_LENGTH  # type: ignore
+
+    def _flags(self) -> bool:
+        # whether the elements are bools rather than `bits[1]` integers
+        return self.__pynarist_redirector__.TYPE_ELEMENT.TYPE_ELEMENT is bool  # type: ignore
+
+    def build(self, source: Any) -> bytes:
+        if not hasattr(source, "__len__"):
+            source = list(source)
+        width, length = self._layout()
+        if length is None:
+            return self.prefix.pack(len(source)) + packBits(source, width)
+        if len(source) != length:
+            raise UsageError.new(
+                f"array data length {len(source)} and type length {length} not matched"
+            )
+        return packBits(source, width)
+
+    def parse(self, source: bytes) -> list:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[list, int]:
+        width, length = self._layout()
+        offset = 0
+        if length is None:
+            length = self.prefix.unpack_from(source)[0]
+            offset = 4
+        # counted in elements rather than bytes, as elements take less
+        checkLength(length, getImpl(byte), (len(source) - offset) * 8 // width)
+        size = (length * width + 7) // 8
+        values = unpackBits(source[offset : offset + size], length, width, self._flags())
+        return values, offset + size
+
+    def skip(self, source: bytes) -> int:
+        width, length = self._layout()
+        if length is None:
+            return checkSkip(4 + (self.prefix.unpack_from(source)[0] * width + 7) // 8, source)
+        return checkSkip((length * width + 7) // 8, source)
+
+    def parseStream(self) -> ParseStream:
+        width, length = self._layout()
+        if length is None:
+            length = self.prefix.unpack((yield 4))[0]
+        checkLength(length, getImpl(byte), None)
+        size = (length * width + 7) // 8
+        return unpackBits((yield size) if size else b"", length, width, self._flags())
+
+    def minSize(self) -> int:
+        width, length = self._layout()
+        return 4 if length is None else (length * width + 7) // 8
+
+
+class ImplEndian:
     __slots__ = ('__pynarist_redirector__',)
+    __pynarist_redirector__: endian
+
+    def _impl(self) -> Implementation:
+        redirector = self.__pynarist_redirector__
+        return getImpl(redirector.TYPE_ELEMENT, redirector.BYTEORDER)
+
+    def build(self, source: Any) -> bytes:
+        return self._impl().build(source)
+
+    def parse(self, source: bytes) -> Any:
+        return self._impl().parse(source)
+
+    def parseWithSize(self, source: bytes) -> tuple[Any, int]:
+        return self._impl().parseWithSize(source)
+
+    def parseStream(self) -> ParseStream:
+        return self._impl().parseStream()
+
+    def minSize(self) -> int:
+        return minSize(self._impl())
+
+
+class ImplOptional:
+    __slots__ = ('__pynarist_redirector__', 'byteorder')
+    __pynarist_redirector__: optional
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = byteorder
+
+    def withByteOrder(self, byteorder: str) -> "ImplOptional":
+        return type(self)(byteorder)
+
+    def _impl(self) -> Implementation:
+        return getImpl(self.__pynarist_redirector__.TYPE_ELEMENT, self.byteorder)
+
+    def build(self, source: Any) -> bytes:
+        if source is None:
+            return b"\x00"
+        return b"\x01" + self._impl().build(source)
+
+    def parse(self, source: bytes) -> Any:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[Any, int]:
+        if not struct.unpack_from("?", source)[0]:
+            return None, 1
+        value, size = self._impl().parseWithSize(source[1:])
+        return value, 1 + size
+
+    def parseStream(self) -> ParseStream:
+        if not (yield 1)[0]:
+            return None
+        return (yield from self._impl().parseStream())
+
+    def minSize(self) -> int:
+        return 1
+
+
+class ImplDeprecated:
+    """
+    The impl of a `deprecated[...]` model field, wrapping the impl of its
+    element; not registered, as the flag only applies to model fields.
+    """
+
+    __slots__ = ('__pynarist_redirector__', 'impl')
+    __pynarist_redirector__: deprecated
+
+    def __init__(self, impl: Implementation) -> None:
+        self.impl = impl
+
+    def build(self, source: Any) -> bytes:
+        return self.impl.build(source)
+
+    def parse(self, source: bytes) -> None:
+        return None
+
+    def parseWithSize(self, source: bytes) -> tuple[None, int]:
+        return None, skip(self.impl, source)
+
+    def parseStream(self) -> ParseStream:
+        yield from self.impl.parseStream()
+        return None
+
+    def skip(self, source: bytes) -> int:
+        return skip(self.impl, source)
+
+    def minSize(self) -> int:
+        return minSize(self.impl)
+
+
+def _adopt(member: type, value: Any) -> Any:
+    # a `UserList` or `UserString` flag around a parsed value, without
+    # copying or validating it again
+    wrapped = member.__new__(member)
+    wrapped.data = value
+    return wrapped
+
+
+def _memberWrapper(member: type) -> Callable[[Any], Any] | None:
+    # how a parsed value is given back the type of its union member, so
+    # that it builds with the same tag
+    if getattr(member, "__pynarist_redirect__", None) is endian:
+        return _memberWrapper(member.TYPE_ELEMENT)  # type: ignore
+    if issubclass(member, (UserList, UserString)):
+        return lambda value: _adopt(member, value)
+    if issubclass(member, (int, float)) and member not in (int, float, bool):
+        return member
+    return None
+
+
+def _plainTypes(member: type) -> tuple[type, ...]:
+    # the plain types that members whose flag is not a value type parse
+    # to and build from
+    redirect = getattr(member, "__pynarist_redirect__", None)
+    if redirect is endian:
+        element = member.TYPE_ELEMENT  # type: ignore
+        return (element, *_plainTypes(element))
+    if redirect in (delta, packed, vector, array, chunked):
+        return (list,)
+    if member is blob or redirect in (fixedbytes, undecoded):
+        return (memoryview, bytes, bytearray)
+    if redirect is interned:
+        return (str,)
+    if member is null:
+        return (type(None),)
+    return ()
+
+
+class ImplUnion:
+    """
+    Parsed values keep the type of their member: `short` and `varchar`
+    members parse to `short` and `varchar` values, and so on, so that a
+    parsed value builds with the same tag. Members whose flag is not a
+    value type, such as `blob` or `delta[...]`, and lists given for
+    `vector[...]` members are matched by their plain type, the first such
+    member winning.
+    """
+
+    __slots__ = (
+        '__pynarist_redirector__',
+        'byteorder',
+        'tag',
+        'table',
+        'tags',
+        'wrappers',
+    )
+    __pynarist_redirector__: union
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = byteorder
+        self.tag: struct.Struct | None = None
+        self.table: tuple[Implementation, ...] = ()
+        self.tags: dict[type, int] = {}
+        self.wrappers: tuple[Callable[[Any], Any] | None, ...] = ()
+
+    def withByteOrder(self, byteorder: str) -> "ImplUnion":
+        return type(self)(byteorder)
+
+    def _prepare(self) -> struct.Struct:
+        # resolved on first use, as the member types may be models whose
+        # impls are only registered later
+        members: tuple = self.__pynarist_redirector__.TYPE_MEMBERS  # type: ignore
+        self.table = tuple(getImpl(member, self.byteorder) for member in members)
+        # the first member wins when a type is listed twice
+        self.tags = {}
+        for index, member in enumerate(members):
+            self.tags.setdefault(member, index)
+        for index, member in enumerate(members):
+            for plain in _plainTypes(member):
+                self.tags.setdefault(plain, index)
+        self.wrappers = tuple(_memberWrapper(member) for member in members)
+        self.tag = struct.Struct(self.byteorder + ("B" if len(members) <= 256 else "H"))
+        return self.tag
+
+    def _tagOf(self, source: Any) -> int:
+        tag = self.tags.get(type(source))
+        if tag is not None:
+            return tag
+
+        from pynarist._schema import describe
+
+        members = self.__pynarist_redirector__.TYPE_MEMBERS
+        for index, member in enumerate(members):  # type: ignore
+            if isinstance(source, member) or describe(type(source)) == describe(member):
+                return index
+        raise UsageError.new(f"union has no member for type {type(source).__name__}")
+
+    def build(self, source: Any) -> bytes:
+        tag = self.tag or self._prepare()
+        index = self._tagOf(source)
+        return tag.pack(index) + self.table[index].build(source)
+
+    def parse(self, source: bytes) -> Any:
+        return self.parseWithSize(source)[0]
+
+    def parseWithSize(self, source: bytes) -> tuple[Any, int]:
+        tag = self.tag or self._prepare()
+        index = tag.unpack_from(source)[0]
+        if index >= len(self.table):
+            raise ParseError.new(f"union tag {index} out of range")
+        value, size = self.table[index].parseWithSize(source[tag.size :])
+        wrapper = self.wrappers[index]
+        if wrapper is not None:
+            value = wrapper(value)
+        return value, tag.size + size
+
+    def parseStream(self) -> ParseStream:
+        tag = self.tag or self._prepare()
+        index = tag.unpack((yield tag.size))[0]
+        if index >= len(self.table):
+            raise ParseError.new(f"union tag {index} out of range")
+        value = yield from self.table[index].parseStream()
+        wrapper = self.wrappers[index]
+        return value if wrapper is None else wrapper(value)
+
+    def minSize(self) -> int:
+        tag = self.tag or self._prepare()
+        return tag.size + min(minSize(impl) for impl in self.table)
+
+
+class ImplTextMode:
+    __slots__ = ('__pynarist_redirector__', 'byteorder', 'inner')
+    __pynarist_redirector__: interned | undecoded
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.byteorder = byteorder
+        self.inner: Implementation | None = None
+
+    def withByteOrder(self, byteorder: str) -> "ImplTextMode":
+        return type(self)(byteorder)
+
+    def _impl(self) -> Implementation:
+        # the impl of the string type, with its decoder swapped out
+        inner = self.inner
+        if inner is None:
+            redirector = self.__pynarist_redirector__
+            inner = copy.copy(getImpl(redirector.TYPE_ELEMENT, self.byteorder))
+            if redirector.__pynarist_redirect__ is interned:
+                inner.decode = internText  # type: ignore
+            else:
+                inner.decode = rawText  # type: ignore
+            self.inner = inner
+        return inner
+
+    def build(self, source: Any) -> bytes:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return self._buildRaw(memoryview(source).cast("B"))
+        return self._impl().build(source)
+
+    def _buildRaw(self, view: memoryview) -> bytes:
+        # the UTF-8 text of a forwarded field, written as it is instead of
+        # being decoded and encoded again
+        element = self.__pynarist_redirector__.TYPE_ELEMENT
+        if element is str:
+            return self._impl().prefix.pack(len(view)) + view  # type: ignore
+        if element is varchar:
+            if len(view) > 255:
+                raise UsageError.new("varchar data must be of 255 bytes or less")
+            return bytes((len(view),)) + view
+        if element is char:
+            name, length = "char", 1
+        else:
+            name, length = "fixed string", element.TYPE_LENGTH  # type: ignore
+        if len(view) != length:
+            raise UsageError.new(
+                f"{name} data length {len(view)} and type length {length} not matched"
+            )
+        return bytes(view)
+
+    def parse(self, source: bytes) -> Any:
+        return self._impl().parse(source)
+
+    def parseWithSize(self, source: bytes) -> tuple[Any, int]:
+        return self._impl().parseWithSize(source)
+
+    def parseStream(self) -> ParseStream:
+        return self._impl().parseStream()
+
+    def skip(self, source: bytes) -> int:
+        return skip(self._impl(), source)
+
+    def minSize(self) -> int:
+        return minSize(self._impl())
+
+
+class ImplVarChar:
+    __slots__ = ('__pynarist_redirector__', 'decode')
     __pynarist_redirector__: varchar
 
+    def __init__(self) -> None:
+        self.decode = decodeText
+
     def build(self, source: varchar):
         encoded = source.encode("utf-8")
         return struct.pack("B", len(encoded)) + encoded
 
     def parse(self, source: bytes) -> str:
-        length = struct.unpack_from("B", source)[0]
-        return str(source[1 : 1 + length].decode("utf-8"))
+        return self.parseWithSize(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[str, int]:
         length = struct.unpack_from("B", source)[0]
-        return str(source[1 : 1 + length].decode("utf-8")), 1 + length
+        checkString(length, len(source) - 1)
+        return self.decode(source[1 : 1 + length]), 1 + length
+
+    def skip(self, source: bytes) -> int:
+        return checkSkip(1 + source[0], source)
+
+    def parseStream(self) -> ParseStream:
+        length = (yield 1)[0]
+        checkString(length, None)
+        return self.decode((yield length))
+
+    def minSize(self) -> int:
+        return 1
 
 
 class ImplChar:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'decode')
     __pynarist_redirector__: char
 
+    def __init__(self) -> None:
+        self.decode = decodeText
+
     def build(self, source: char):
         return source.encode("utf-8")
 
     def parse(self, source: bytes) -> str:
-        return source.decode("utf-8")
+        return self.decode(source[:1])
 
     def parseWithSize(self, source: bytes) -> tuple[str, int]:
-        return source.decode("utf-8"), 1
+        return self.decode(source[:1]), 1
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 1))
+
+    def minSize(self) -> int:
+        return 1
 
 
 class ImplString:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'prefix', 'decode')
     __pynarist_redirector__: str
 
+    def __init__(self, byteorder: str = "=") -> None:
+        self.prefix = struct.Struct(byteorder + "I")
+        self.decode = decodeText
+
+    def withByteOrder(self, byteorder: str) -> "ImplString":
+        return type(self)(byteorder)
+
     def build(self, source: str):
         encoded = source.encode("utf-8")
-        return struct.pack("I", len(encoded)) + encoded
+        return self.prefix.pack(len(encoded)) + encoded
 
     def parse(self, source: bytes) -> str:
-        length = struct.unpack_from("i", source)[0]
-        return str(source[4 : 4 + length].decode("utf-8"))
+        return self.parseWithSize(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[str, int]:
-        length = struct.unpack_from("i", source)[0]
-        return str(source[4 : 4 + length].decode("utf-8")), 4 + length
+        length = self.prefix.unpack_from(source)[0]
+        checkString(length, len(source) - 4)
+        return self.decode(source[4 : 4 + length]), 4 + length
+
+    def skip(self, source: bytes) -> int:
+        return checkSkip(4 + self.prefix.unpack_from(source)[0], source)
+
+    def parseStream(self) -> ParseStream:
+        length = self.prefix.unpack((yield 4))[0]
+        checkString(length, None)
+        return self.decode((yield length))
+
+    def minSize(self) -> int:
+        return 4
 
 
 class ImplBool:
-    __slots__ = ('__pynarist_redirector__',)
+    __slots__ = ('__pynarist_redirector__', 'format')
     __pynarist_redirector__: bool
+    CODE = "?"
+
+    def __init__(self, byteorder: str = "=") -> None:
+        self.format = struct.Struct(byteorder + self.CODE)
+
+    def withByteOrder(self, byteorder: str) -> "ImplBool":
+        return type(self)(byteorder)
 
     def build(self, source: bool):
-        return struct.pack("?", source)
+        return self.format.pack(source)
 
     def parse(self, source: bytes) -> bool:
-        return struct.unpack_from("?", source)[0]
+        return self.format.unpack_from(source)[0]
 
     def parseWithSize(self, source: bytes) -> tuple[bool, int]:
-        return struct.unpack_from("?", source)[0], 1
+        return self.format.unpack_from(source)[0], 1
+
+    def parseStream(self) -> ParseStream:
+        return self.parse((yield 1))
+
+    def minSize(self) -> int:
+        return 1
 
 
 registerImpl(null, ImplNull())
@@ -494,6 +1928,17 @@ registerImpl(char, ImplChar())
 registerImpl(varchar, ImplVarChar())
 registerImpl(fixedstring, ImplFixedString())
 registerImpl(str, ImplString())
+registerImpl(blob, ImplBlob())
+registerImpl(fixedbytes, ImplFixedBytes())
 registerImpl(bool, ImplBool())
 registerImpl(array, ImplArray())
 registerImpl(vector, ImplVector())
+registerImpl(chunked, ImplChunked())
+registerImpl(delta, ImplDelta())
+registerImpl(bits, ImplBits())
+registerImpl(packed, ImplPacked())
+registerImpl(endian, ImplEndian())
+registerImpl(union, ImplUnion())
+registerImpl(optional, ImplOptional())
+registerImpl(interned, ImplTextMode())
+registerImpl(undecoded, ImplTextMode())
@@ -0,0 +1,96 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, NamedTuple
+
+from pynarist._errors import ParseError
+
+# size of a list slot, used to estimate what a decoded sequence allocates
+SLOT_SIZE = 8
+
+
+# a NamedTuple rather than a frozen dataclass, as dataclasses imports inspect
+class ParseLimits(NamedTuple):
+    """
+    Bounds on the work a single parse may do, for untrusted input.
+
+    Every limit is counted per top-level record; `None` disables it.
+
+    - `maxVectorLength`: elements in any one vector, array or chunked field
+    - `maxStringBytes`: encoded bytes of all strings together
+    - `maxDepth`: nesting depth of records
+    - `maxAllocation`: estimated bytes allocated for strings and list slots
+    """
+
+    maxVectorLength: int | None = None
+    maxStringBytes: int | None = None
+    maxDepth: int | None = None
+    maxAllocation: int | None = None
+
+
+class LimitState:
+    """
+    The running totals of one parse, checked against its `ParseLimits`.
+    """
+
+    __slots__ = ("limits", "stringBytes", "allocation", "depth")
+
+    def __init__(self, limits: ParseLimits) -> None:
+        self.limits = limits
+        self.stringBytes = 0
+        self.allocation = 0
+        self.depth = 0
+
+    def addLength(self, length: int, decoded: int = 0) -> None:
+        limits = self.limits
+        total = decoded + length
+        if limits.maxVectorLength is not None and total > limits.maxVectorLength:
+            raise ParseError.new(
+                f"sequence length {total} exceeds the limit of {limits.maxVectorLength}"
+            )
+        self._allocate(length * SLOT_SIZE)
+
+    def addString(self, size: int) -> None:
+        limits = self.limits
+        self.stringBytes += size
+        if limits.maxStringBytes is not None and self.stringBytes > limits.maxStringBytes:
+            raise ParseError.new(
+                f"string bytes exceed the limit of {limits.maxStringBytes}"
+            )
+        self._allocate(size)
+
+    def enter(self) -> None:
+        self.depth += 1
+        if self.limits.maxDepth is not None and self.depth > self.limits.maxDepth:
+            raise ParseError.new(
+                f"nesting depth exceeds the limit of {self.limits.maxDepth}"
+            )
+
+    def exit(self) -> None:
+        self.depth -= 1
+
+    def _allocate(self, size: int) -> None:
+        self.allocation += size
+        limit = self.limits.maxAllocation
+        if limit is not None and self.allocation > limit:
+            raise ParseError.new(f"allocation exceeds the limit of {limit} bytes")
+
+
+activeLimits: ContextVar[LimitState | None] = ContextVar(
+    "pynarist_limits", default=None
+)
+
+
+@contextmanager
+def applyLimits(limits: ParseLimits) -> Iterator[LimitState]:
+    """
+    Enforce `limits` on every parse inside the block.
+    """
+    state = LimitState(limits)
+    token = activeLimits.set(state)
+    try:
+        yield state
+    finally:
+        activeLimits.reset(token)
@@ -0,0 +1,55 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+"""
+Building the long vectors of a record on an executor, in chunks.
+
+Only vectors whose elements are built one at a time, such as nested
+records and strings, are split up; vectors of numbers are already packed
+with a single struct. The chunks are joined in order with the rest of the
+record, so the output is the same as that of `build()`.
+"""
+
+from concurrent.futures import Executor, Future
+from typing import Any, Sequence
+
+from pynarist._impls import ImplVector, Implementation, getImpl
+
+# elements per task; smaller chunks spend more time on scheduling
+PARALLEL_CHUNK_SIZE = 4096
+
+
+def _buildChunk(element: type, byteorder: str, items: Sequence) -> bytes:
+    # module-level, so that process pools can pickle it
+    return b"".join(map(getImpl(element, byteorder).build, items))
+
+
+def buildChunks(
+    impl: Implementation, value: Any, executor: Executor, chunkSize: int
+) -> list:
+    """
+    The parts of a field, where the elements of a long vector are futures
+    of their chunks.
+    """
+    if type(impl) is not ImplVector or not hasattr(value, "__len__"):
+        return [impl.build(value)]
+    element = impl.__pynarist_redirector__.TYPE_ELEMENT
+    byteorder = impl.byteorder  # type: ignore
+    if len(value) <= chunkSize or hasattr(getImpl(element, byteorder), "CODE"):
+        return [impl.build(value)]
+    # slices of a `vector[T]` would be rebuilt through its constructor
+    items = list(value)
+    return [
+        impl.prefix.pack(len(items)),  # type: ignore
+        *(
+            executor.submit(_buildChunk, element, byteorder, items[start : start + chunkSize])
+            for start in range(0, len(items), chunkSize)
+        ),
+    ]
+
+
+def resolve(parts: list) -> list:
+    """
+    `parts` with every future replaced by its result.
+    """
+    return [part.result() if isinstance(part, Future) else part for part in parts]
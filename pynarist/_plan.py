@@ -0,0 +1,332 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+import struct
+from typing import Any, Callable
+
+from pynarist._errors import ParseError
+from pynarist._impls import (
+    ImplDeprecated,
+    Implementation,
+    checkSkip,
+    deprecated,
+    getImpl,
+    minSize,
+    optional,
+    since,
+    skip,
+)
+
+# the envelope of a record of a versioned model: the writer's version, the
+# width of its presence bitmap and the length of the rest of the record
+VERSION_HEADER = struct.Struct("<HBI")
+
+# A layout lists the fields of a run in order. Each entry is a field name
+# with `None` for a primitive, or with `(model, layout)` for a nested model
+# whose fields were folded into the run.
+Layout = tuple[tuple[str, "tuple[type, Layout] | None"], ...]
+
+
+class Run:
+    """
+    A run of consecutive fixed-width fields, packed with a single struct.
+    """
+
+    __slots__ = ("format", "codes", "align", "layout", "spans")
+
+    def __init__(
+        self,
+        byteorder: str,
+        codes: str,
+        align: str,
+        layout: Layout,
+        spans: dict[str, tuple[int, int]],
+    ) -> None:
+        self.format = struct.Struct(byteorder + codes)
+        self.codes = codes
+        self.align = align
+        self.layout = layout
+        # the (offset, size) of every top-level field within the run
+        self.spans = spans
+
+    def pack(self, obj: Any) -> bytes:
+        values = []
+        _flatten(self.layout, obj, values)
+        return self.format.pack(*values)
+
+    def unpack(self, values: tuple, result: dict[str, Any]) -> None:
+        _unflatten(self.layout, values, 0, result)
+
+
+def _flatten(layout: Layout, obj: Any, values: list) -> None:
+    for name, nested in layout:
+        value = getattr(obj, name)
+        if nested is None:
+            values.append(value)
+        else:
+            _flatten(nested[1], value, values)
+
+
+def _unflatten(layout: Layout, values: tuple, index: int, result: dict) -> int:
+    for name, nested in layout:
+        if nested is None:
+            result[name] = values[index]
+            index += 1
+        else:
+            model, sublayout = nested
+            fields: dict[str, Any] = {}
+            index = _unflatten(sublayout, values, index, fields)
+            result[name] = model(**fields)
+    return index
+
+
+class OptionalField:
+    """
+    An `optional[...]` field of a model, written with the impl of its
+    element only when its bit in the presence bitmap is set.
+    """
+
+    __slots__ = ("name", "impl", "mask")
+
+    def __init__(self, name: str, impl: Implementation, mask: int) -> None:
+        self.name = name
+        self.impl = impl
+        self.mask = mask
+
+
+Step = Run | OptionalField | tuple[str, Implementation]
+
+
+class Plan:
+    """
+    The precompiled layout of a model: its fields grouped into steps, where
+    a step is a `Run`, an `OptionalField`, or a `(name, impl)` pair for a
+    field that is built and parsed by its own implementation.
+
+    Models with optional fields start with a presence bitmap of `presence`
+    bytes, one bit per optional field in declaration order.
+
+    Plans of versioned models have the `version` they write, and records
+    start with a `VERSION_HEADER`; plans of unversioned ones have version 0.
+    """
+
+    __slots__ = (
+        "byteorder",
+        "steps",
+        "impls",
+        "presence",
+        "version",
+        "deprecated",
+        "skips",
+        "build",
+        "parse",
+    )
+
+    def __init__(
+        self,
+        byteorder: str,
+        steps: list[Step],
+        impls: dict[str, Implementation],
+        presence: int = 0,
+        version: int = 0,
+        deprecated: tuple[str, ...] = (),
+    ) -> None:
+        self.byteorder = byteorder
+        self.steps = steps
+        self.impls = impls
+        self.presence = presence
+        self.version = version
+        # the fields that are skipped when parsing, leaving their defaults
+        self.deprecated = deprecated
+        # for each step that is not a run, `skip(source) -> size` of its field
+        self.skips: list[Callable[[memoryview], int] | None] = [
+            None if isinstance(step, Run) else _skipper(_stepImpl(step))
+            for step in steps
+        ]
+        # specialized functions, set by `Model.compile()` when generated
+        self.build: Callable[[Any], bytes] | None = None
+        self.parse: Callable[[memoryview, int], tuple[Any, int]] | None = None
+
+    @property
+    def fixed(self) -> bool:
+        """whether every field of the model is packed into a single run"""
+        return (
+            not self.presence
+            and not self.version
+            and len(self.steps) == 1
+            and isinstance(self.steps[0], Run)
+        )
+
+    def skip(self, source: memoryview) -> int:
+        """the size of the record at the start of `source`"""
+        if self.version:
+            if len(source) < VERSION_HEADER.size:
+                raise ParseError.new("record is shorter than its version header")
+            return checkSkip(VERSION_HEADER.size + VERSION_HEADER.unpack_from(source)[2], source)
+        offset = self.presence
+        presence = readPresence(source, self.presence)
+        for step, skipper in zip(self.steps, self.skips):
+            if skipper is None:
+                offset += step.format.size  # type: ignore
+            elif type(step) is not OptionalField or presence & step.mask:
+                offset += skipper(source[offset:])
+        return offset
+
+    def minSize(self) -> int:
+        header = VERSION_HEADER.size if self.version else 0
+        return header + self.presence + sum(
+            step.format.size if isinstance(step, Run) else minSize(step[1])
+            for step in self.steps
+            if not isinstance(step, OptionalField)
+        )
+
+
+def _stepImpl(step: Step) -> Implementation:
+    return step.impl if isinstance(step, OptionalField) else step[1]  # type: ignore
+
+
+def _skipper(impl: Implementation) -> Callable[[memoryview], int]:
+    return getattr(impl, "skip", None) or (lambda source: skip(impl, source))
+
+
+def skipAt(skipper: Callable[[memoryview], int], view: memoryview, offset: int) -> int:
+    """
+    The size of the field at `offset` of a record, checked against its end.
+    """
+    try:
+        return checkSkip(skipper(view[offset:]), view[offset:])
+    except (struct.error, IndexError) as e:
+        raise ParseError.new("record is shorter than its fields") from e
+
+
+def readPresence(view: memoryview, size: int, offset: int = 0) -> int:
+    """
+    Read the presence bitmap of `size` bytes at `offset`.
+    """
+    if not size:
+        return 0
+    if len(view) < offset + size:
+        raise ParseError.new("record is shorter than its presence bitmap")
+    return int.from_bytes(view[offset : offset + size], "little")
+
+
+def _spans(byteorder: str, groups: list[str], layout: list) -> dict[str, tuple[int, int]]:
+    # `groups` holds the codes of each field of `layout`; a field ends where
+    # the codes up to it end, and starts its own size before that
+    spans = {}
+    for index, (name, _) in enumerate(layout):
+        end = struct.calcsize(byteorder + "".join(groups[: index + 1]))
+        size = struct.calcsize(byteorder + groups[index])
+        spans[name] = (end - size, size)
+    return spans
+
+
+def _alignment(byteorder: str, codes: str) -> str:
+    # the code with the strictest native alignment, used to pad like C does
+    if byteorder != "@" or not codes:
+        return ""
+    return max(codes.replace("0", ""), key=lambda code: struct.calcsize("@" + code))
+
+
+def fieldVersion(source: type) -> int:
+    """
+    The version of a versioned model that added a field of type `source`.
+    """
+    if getattr(source, "__pynarist_redirect__", None) is since:
+        return source.VERSION  # type: ignore
+    return 1
+
+
+def compileModel(
+    model: type, version: int | None = None, presence: int | None = None
+) -> Plan:
+    """
+    Build the plan of a model class from its fields and byte order.
+
+    For versioned models, `version` selects the fields written by that
+    version, and `presence` overrides the width of the presence bitmap,
+    as newer writers may have more optional fields than the model knows.
+    """
+    byteorder = model.__pynarist_byteorder__
+    if version is None:
+        version = model.__pynarist_version__
+    retired: list[str] = []
+    steps: list[Step] = []
+    impls: dict[str, Implementation] = {}
+    codes: list[str] = []
+    layout: list = []
+
+    def flush() -> None:
+        if layout:
+            joined = "".join(codes)
+            steps.append(
+                Run(
+                    byteorder,
+                    joined,
+                    _alignment(byteorder, joined),
+                    tuple(layout),
+                    _spans(byteorder, codes, layout),
+                )
+            )
+            codes.clear()
+            layout.clear()
+
+    optionals = 0
+    for name, source in model.fields.items():
+        if version and fieldVersion(source) > version:
+            # fields are only appended, so the rest is newer as well
+            break
+        if getattr(source, "__pynarist_redirect__", None) is since:
+            source = source.TYPE_ELEMENT  # type: ignore
+        if getattr(source, "__pynarist_redirect__", None) is deprecated:
+            source = source.TYPE_ELEMENT  # type: ignore
+            retired.append(name)
+
+        if getattr(source, "__pynarist_redirect__", None) is optional:
+            impl = getImpl(source.TYPE_ELEMENT, byteorder)
+            if retired and retired[-1] == name:
+                impl = ImplDeprecated(impl)
+            impls[name] = impl
+            flush()
+            steps.append(OptionalField(name, impl, 1 << optionals))
+            optionals += 1
+            continue
+
+        impl = getImpl(source, byteorder)
+        if retired and retired[-1] == name:
+            impl = impls[name] = ImplDeprecated(impl)
+            flush()
+            steps.append((name, impl))
+            continue
+        impls[name] = impl
+
+        code = getattr(impl, "CODE", None)
+        if code is not None:
+            codes.append(code)
+            layout.append((name, None))
+            continue
+
+        plan = getattr(source, "__pynarist_plan__", False)
+        if plan is not False:
+            plan = source.compile()
+            if plan.fixed and plan.byteorder == byteorder:
+                run = plan.steps[0]
+                # a nested struct starts at its own alignment, as in C
+                codes.append(f"0{run.align}{run.codes}" if run.align else run.codes)
+                layout.append((name, (source, run.layout)))
+                continue
+
+        flush()
+        steps.append((name, impl))
+
+    flush()
+    if byteorder == "@" and not optionals and len(steps) == 1:
+        # trailing padding, so that arrays of the record match C's sizeof
+        run = steps[0]
+        if run.align:
+            steps[0] = Run(
+                byteorder, f"{run.codes}0{run.align}", run.align, run.layout, run.spans
+            )
+    if presence is None:
+        presence = (optionals + 7) // 8
+    return Plan(byteorder, steps, impls, presence, version, tuple(retired))
@@ -0,0 +1,106 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+import struct
+from typing import Any
+
+from pynarist._errors import ParseError
+from pynarist._limits import ParseLimits
+
+# the fingerprint that prefixes a framed record
+FRAME_HEADER = struct.Struct("<Q")
+
+__pynarist_schemas__: dict[int, type] = {}
+# models registered since the last lookup, fingerprinted only when needed
+_pending: list[type] = []
+# fingerprints shared by distinct models, which frames cannot tell apart
+_conflicts: dict[int, list[type]] = {}
+
+
+def describe(source: type) -> str:
+    """
+    The canonical text of a type's schema, which its fingerprint hashes.
+
+    Models are described by name, byte order and fields; parametrized types
+    by their base type and parameters; any other type by its name.
+    """
+    if isinstance(source, tuple):
+        # e.g. the members of a union
+        return f"({','.join(describe(member) for member in source)})"
+    if not isinstance(source, type):
+        return repr(source)
+
+    if hasattr(source, "__pynarist_plan__"):
+        fields = ",".join(
+            f"{key}:{describe(value)}" for key, value in source.fields.items()
+        )
+        return f"{source.__name__}{source.__pynarist_byteorder__}{{{fields}}}"
+
+    redirect = getattr(source, "__pynarist_redirect__", None)
+    if redirect is not None:
+        parameters = ",".join(
+            f"{key}={describe(value)}"
+            for key, value in sorted(vars(source).items())
+            if key.isupper()
+        )
+        return f"{redirect.__name__}[{parameters}]"
+
+    return source.__name__
+
+
+def fingerprint(source: type) -> int:
+    """
+    A stable 64-bit hash of the schema of a model or type.
+    """
+    # imported on first use, as hashlib loads OpenSSL
+    from hashlib import blake2b
+
+    digest = blake2b(describe(source).encode("utf-8"), digest_size=8)
+    return FRAME_HEADER.unpack(digest.digest())[0]
+
+
+def registerSchema(model: type) -> None:
+    """
+    Make framed records of `model` decodable with `parseFramed()`.
+    """
+    _pending.append(model)
+
+
+def getSchema(key: int) -> type:
+    for model in _pending:
+        registered = fingerprint(model)
+        known = __pynarist_schemas__.setdefault(registered, model)
+        if known is not model:
+            _conflicts.setdefault(registered, [known]).append(model)
+    _pending.clear()
+
+    conflict = _conflicts.get(key)
+    if conflict is not None:
+        names = ", ".join(f"{model.__module__}.{model.__qualname__}" for model in conflict)
+        raise ParseError.new(
+            f"fingerprint {key:#018x} is shared by the models {names}",
+            "models with the same name and fields cannot be told apart in frames; rename one of them",
+        )
+    try:
+        return __pynarist_schemas__[key]
+    except KeyError:
+        raise ParseError.new(f"no model registered for fingerprint {key:#018x}") from None
+
+
+def parseFramedWithSize(
+    data: bytes, limits: ParseLimits | None = None
+) -> tuple[Any, int]:
+    """
+    Parse a record written by `Model.buildFramed()`, dispatching on its
+    fingerprint to the registered model.
+    """
+    view = memoryview(data)
+    if len(view) < FRAME_HEADER.size:
+        raise ParseError.new("framed record is shorter than its header")
+    model = getSchema(FRAME_HEADER.unpack_from(view)[0])
+    record, size = model.parseWithSize(view[FRAME_HEADER.size :], limits)
+    return record, FRAME_HEADER.size + size
+
+
+def parseFramed(data: bytes, limits: ParseLimits | None = None) -> Any:
+    return parseFramedWithSize(data, limits)[0]
@@ -0,0 +1,127 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+"""
+Records as plain values, for `Model.parseAs()` and `Model.buildFrom()`.
+
+A target is `dict`, `tuple` or a class called with the fields as keyword
+arguments, such as a dataclass. Nested records take the same form; for a
+class, that of the type annotation of the field, or of the element of a
+`list[...]` annotation, and a dict when there is none.
+"""
+
+from collections import UserList
+from functools import lru_cache
+from typing import Any, get_args, get_type_hints
+
+from pynarist._impls import deprecated, endian, optional, since
+
+# flags that only wrap the type of a field
+_WRAPPERS = (since, deprecated, optional, endian)
+
+
+def isModel(source: Any) -> bool:
+    return getattr(source, "__pynarist_plan__", False) is not False
+
+
+def unwrap(source: type) -> type:
+    """
+    The type of a field without the flags that only wrap it.
+    """
+    while getattr(source, "__pynarist_redirect__", None) in _WRAPPERS:
+        source = source.TYPE_ELEMENT  # type: ignore
+    return source
+
+
+def holdsModels(source: Any) -> bool:
+    """
+    Whether values of `source` may hold records.
+    """
+    if isModel(source):
+        return True
+    element = getattr(source, "TYPE_ELEMENT", None)
+    if isinstance(element, type) and holdsModels(element):
+        return True
+    return any(holdsModels(member) for member in getattr(source, "TYPE_MEMBERS", ()))
+
+
+@lru_cache(maxsize=256)
+def _hints(target: type) -> dict[str, Any]:
+    try:
+        return get_type_hints(target)
+    except Exception:
+        # annotations that do not resolve only lose their nested targets
+        return dict(getattr(target, "__annotations__", {}))
+
+
+def nestedTarget(target: Any, name: str) -> Any:
+    """
+    The target of the records in field `name` of a record read as `target`.
+    """
+    if target is dict or target is tuple:
+        return target
+    hint = _hints(target).get(name)
+    # `Address`, `list[Address]` or `Address | None`
+    for candidate in (hint, *get_args(hint)):
+        if isinstance(candidate, type) and candidate is not type(None):
+            return candidate
+    return dict
+
+
+def convert(value: Any, target: Any) -> Any:
+    """
+    `value` with the records in it replaced by their form as `target`.
+    """
+    model = type(value)
+    if isModel(model):
+        fields = {}
+        for name, source in model.fields.items():
+            field = getattr(value, name, None)
+            if holdsModels(source):
+                field = convert(field, nestedTarget(target, name))
+            fields[name] = field
+        if target is dict:
+            return fields
+        if target is tuple:
+            return tuple(fields.values())
+        return target(**fields)
+    if isinstance(value, UserList):
+        # `vector[T]` values, such as those of union members
+        value = value.data
+    if isinstance(value, list):
+        return [convert(element, target) for element in value]
+    return value
+
+
+def toModel(model: type, value: Any) -> Any:
+    """
+    A record of `model` from its form as a dict, a tuple or an object with
+    the fields as attributes.
+    """
+    if isinstance(value, model):
+        return value
+    if isinstance(value, dict):
+        fields = dict(value)
+    elif isinstance(value, tuple):
+        fields = dict(zip(model.fields, value))
+    else:
+        fields = {
+            name: getattr(value, name)
+            for name in model.fields  # type: ignore
+            if hasattr(value, name)
+        }
+    for name, field in fields.items():
+        source = model.fields.get(name)  # type: ignore
+        if field is not None and source is not None and holdsModels(source):
+            fields[name] = _toField(unwrap(source), field)
+    return model(**fields)
+
+
+def _toField(source: type, value: Any) -> Any:
+    if isModel(source):
+        return toModel(source, value)
+    element = getattr(source, "TYPE_ELEMENT", None)
+    if isinstance(element, type) and isModel(unwrap(element)):
+        return [toModel(unwrap(element), x) for x in value]
+    # unions and deeper nesting take records as they are
+    return value
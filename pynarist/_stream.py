@@ -0,0 +1,133 @@
+# Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
+# for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+
+from typing import Any
+
+from pynarist._errors import ParseError, UsageError
+from pynarist._impls import ParseStream, getImpl
+from pynarist._limits import LimitState, ParseLimits, activeLimits
+
+
+class Decoder:
+    """
+    A push-style decoder for a stream of records.
+
+    Chunks of any size are passed to `feed()`, which returns every record
+    completed by that chunk. The state of an unfinished record is kept
+    between calls, so no byte is parsed twice.
+
+    ```python
+    decoder = Decoder(Person)
+    for packet in packets:
+        for person in decoder.feed(packet):
+            ...
+    decoder.close()
+    ```
+
+    `limits` are enforced on every record, see `ParseLimits`.
+
+    A record that fails to parse, or exceeds the limits, leaves the stream
+    without a known record boundary, so the decoder fails for good: the
+    error is raised from `feed()`, and every later call raises again.
+    """
+
+    __slots__ = (
+        "source",
+        "limits",
+        "_impl",
+        "_buffer",
+        "_offset",
+        "_parser",
+        "_need",
+        "_state",
+        "_error",
+    )
+
+    def __init__(self, source: type, limits: ParseLimits | None = None) -> None:
+        if not isinstance(source, type):
+            raise UsageError.new("Decoder() argument 1 source must be a type")
+
+        self.source = source
+        self.limits = limits
+        self._impl = getImpl(source)
+        self._buffer = bytearray()
+        self._offset = 0
+        self._parser: ParseStream | None = None
+        self._need = 0
+        self._state: LimitState | None = None
+        self._error: Exception | None = None
+
+    @property
+    def pending(self) -> int:
+        """number of bytes received but not yet consumed by a record"""
+        return len(self._buffer) - self._offset
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """
+        Add `chunk` to the stream and return the records it completed.
+        """
+        self._checkFailed()
+        self._buffer += chunk
+        result = []
+        token = activeLimits.set(self._state)
+        try:
+            self._decode(result)
+        except Exception as error:
+            self._parser = None
+            self._error = error
+            raise
+        finally:
+            activeLimits.reset(token)
+
+        # drop consumed bytes once they make up most of the buffer, which
+        # keeps compaction amortized linear in the stream size
+        if self._offset > len(self._buffer) // 2:
+            del self._buffer[: self._offset]
+            self._offset = 0
+
+        return result
+
+    def _checkFailed(self) -> None:
+        if self._error is not None:
+            raise ParseError.new(
+                "the decoder failed on an earlier record",
+                "the stream cannot be resynchronized; start a new Decoder at a record boundary",
+            ) from self._error
+
+    def _decode(self, result: list[Any]) -> None:
+        while True:
+            if self._parser is None:
+                if not self.pending:
+                    break
+                if self.limits is not None:
+                    self._state = LimitState(self.limits)
+                    activeLimits.set(self._state)
+                self._parser = self._impl.parseStream()
+                try:
+                    self._need = next(self._parser)
+                except StopIteration:
+                    raise UsageError.new(
+                        "records without any bytes cannot be decoded from a stream"
+                    ) from None
+
+            if self.pending < self._need:
+                break
+
+            data = bytes(self._buffer[self._offset : self._offset + self._need])
+            self._offset += self._need
+            try:
+                self._need = self._parser.send(data)
+            except StopIteration as stop:
+                self._parser = None
+                result.append(stop.value)
+
+    def close(self) -> None:
+        """
+        Finish the stream, failing if it ended in the middle of a record.
+        """
+        self._checkFailed()
+        if self._parser is not None or self.pending:
+            raise ParseError.new(
+                f"stream ended inside a record: {self.pending} bytes left, "
+                f"{self._need} bytes needed"
+            )
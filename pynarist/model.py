@@ -1,19 +1,142 @@
 # Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
 # for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
-import inspect
-from typing import ClassVar, Self, dataclass_transform
+import struct
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    ClassVar,
+    Self,
+    dataclass_transform,
+)
 
 
-from pynarist._errors import UsageError
-from pynarist._impls import Implementation, getImpl, registerImpl
+from pynarist import _accel
+from pynarist._errors import BuildError, ParseError, UsageError
+from pynarist._limits import ParseLimits, activeLimits, applyLimits
+from pynarist._plan import (
+    VERSION_HEADER,
+    OptionalField,
+    Plan,
+    Run,
+    compileModel,
+    fieldVersion,
+    readPresence,
+    skipAt,
+)
+from pynarist._schema import FRAME_HEADER, fingerprint, registerSchema
+from pynarist._shapes import convert, toModel
+from pynarist._impls import (
+    BYTEORDERS,
+    Implementation,
+    ParseStream,
+    buildTo,
+    optional,
+    registerImpl,
+)
+
+if TYPE_CHECKING:
+    # `concurrent.futures` imports `logging`, so it is only loaded by
+    # `buildParallel()`
+    from concurrent.futures import Executor
 
 
 @dataclass_transform(kw_only_default=True)
 class Model:
+    """
+    Base class of records. Fields are declared as annotations; the class
+    keyword `byteorder` selects the struct byte order of the record ("@",
+    "=", "<", ">" or "!"), where "@" also aligns fields like a C struct.
+
+    ```python
+    class Header(Model, byteorder="<"):
+        magic: int
+        length: endian[short, ">"]
+    ```
+
+    With `hashable=True`, records compare and hash by their encoded bytes,
+    which are cached until a field is assigned again. Mutating a nested
+    value in place does not reset the cache.
+
+    With `frozen=True`, fields cannot be assigned after construction and
+    `build()` is computed once per record; records are also hashable.
+
+    With `version=N`, records carry the version of their writer and their
+    length, so that models can evolve. Fields are appended with
+    `since[T, n]` and retired with `deprecated[T]`; readers skip the fields
+    of newer writers and fill those older writers lack from the class
+    attribute of the same name, which appended fields must have.
+
+    ```python
+    class Event(Model, version=2):
+        kind: short
+        source: deprecated[varchar] = varchar("")
+        weight: since[double, 2] = double(1.0)
+    ```
+    """
+
     fields: ClassVar[dict[str, type[Implementation]]] = {}
+    __pynarist_byteorder__: ClassVar[str] = "="
+    __pynarist_hashable__: ClassVar[bool] = False
+    __pynarist_frozen__: ClassVar[bool] = False
+    __pynarist_version__: ClassVar[int] = 0
+    __pynarist_plan__: ClassVar[Plan | None] = None
+    # the plans for records of other versions, keyed by the fields and the
+    # presence bitmap width of their writer
+    __pynarist_versions__: ClassVar[dict[tuple[int, int], Plan]] = {}
+    # the functions of `parseAs()` and `buildFrom()`, by target and shape
+    __pynarist_shapes__: ClassVar[dict[tuple[str, Any], Callable]] = {}
+    __pynarist_fingerprint__: ClassVar[int]
+
+    def __init_subclass__(
+        cls: type[Self],
+        byteorder: str | None = None,
+        hashable: bool | None = None,
+        frozen: bool | None = None,
+        version: int | None = None,
+    ) -> None:
+        # since 3.10, only the model's own fields, as `inspect.get_annotations()`
+        # returns, without importing `inspect`; on 3.14 this also evaluates
+        # the annotations, which are no longer kept in the class `__dict__`
+        cls.fields = dict(cls.__annotations__)
+        cls.__pynarist_plan__ = None
+        cls.__pynarist_versions__ = {}
+        cls.__pynarist_shapes__ = {}
+        if byteorder is not None:
+            if byteorder not in BYTEORDERS:
+                raise UsageError.new(
+                    f"unknown byte order {byteorder!r}; use one of {', '.join(BYTEORDERS)}"
+                )
+            cls.__pynarist_byteorder__ = byteorder
+        if hashable is not None:
+            cls.__pynarist_hashable__ = hashable
+        if frozen is not None:
+            cls.__pynarist_frozen__ = frozen
+            cls.__pynarist_hashable__ |= frozen
+        if version is not None:
+            if not isinstance(version, int) or not 0 < version < 65536:
+                raise UsageError.new("model version must be between 1 and 65535")
+            cls.__pynarist_version__ = version
+        cls._checkVersions()
 
-    def __init_subclass__(cls: type[Self]) -> None:
-        cls.fields = inspect.get_annotations(cls)
+        methods = {}
+        if cls.__pynarist_hashable__:
+            methods.update(
+                __setattr__=Model._encodedSetattr,
+                __delattr__=Model._encodedDelattr,
+                __eq__=Model._encodedEq,
+                __hash__=Model._encodedHash,
+            )
+        if cls.__pynarist_frozen__:
+            methods.update(
+                __setattr__=Model._frozenSetattr,
+                __delattr__=Model._frozenDelattr,
+                build=Model.encoded,
+            )
+        for name, method in methods.items():
+            if name not in cls.__dict__:
+                setattr(cls, name, method)
 
         class Impl:
             __pynarist_redirector__: cls
@@ -21,39 +144,482 @@ class Model:
             def build(self, obj: cls) -> bytes:
                 return obj.build()
 
+            def buildTo(self, obj: cls, stream: BinaryIO) -> None:
+                obj.buildTo(stream)
+
+            def parse(self, data: bytes) -> cls:
+                return cls.parse(data)
+
             def parseWithSize(self, data: bytes) -> tuple[cls, int]:
                 return cls.parseWithSize(data)
 
+            def parseStream(self) -> ParseStream:
+                return cls.parseStream()
+
+            def skip(self, data: bytes) -> int:
+                return cls.compile().skip(memoryview(data))
+
+            def minSize(self) -> int:
+                return cls.compile().minSize()
+
         registerImpl(cls, Impl())  # type: ignore
+        registerSchema(cls)
+
+    @classmethod
+    def _checkVersions(cls) -> None:
+        version = cls.__pynarist_version__
+        previous = 1
+        for name, source in cls.fields.items():
+            added = fieldVersion(source)
+            if added == 1:
+                pass
+            elif not version:
+                raise UsageError.new(
+                    f"{cls.__name__}.{name} is declared with since[...]",
+                    "add the version=... class keyword to version the model",
+                )
+            elif added > version:
+                raise UsageError.new(
+                    f"{cls.__name__}.{name} is added in version {added}, "
+                    f"after the model's version {version}"
+                )
+            elif name not in cls.__dict__:
+                if getattr(source.TYPE_ELEMENT, "__pynarist_redirect__", None) is not optional:  # type: ignore
+                    raise UsageError.new(
+                        f"{cls.__name__}.{name} has no default",
+                        "records of older versions are parsed with the class attribute of the same name",
+                    )
+                setattr(cls, name, None)
+            if added < previous:
+                raise UsageError.new(
+                    f"{cls.__name__}.{name} of version {added} is declared after fields of version {previous}",
+                    "fields can only be appended",
+                )
+            previous = added
 
     def __init__(self, **kwargs) -> None:
-        for key, value in kwargs.items():
-            if key in self.fields:
-                setattr(self, key, value)
-            else:
+        for key in kwargs:
+            if key not in self.fields:
                 raise UsageError(f"Unknown field: {key}")
+        if self.__pynarist_frozen__:
+            self.__dict__.update(kwargs)
+            return
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    @classmethod
+    def compile(cls) -> Plan:
+        """
+        Return the precompiled plan of the model, compiling it on first use.
+        """
+        plan = cls.__pynarist_plan__
+        if plan is None:
+            plan = compileModel(cls)
+            if _accel.ENABLED:
+                plan.build = _accel.generateBuild(plan, cls, Model._buildSteps)
+                plan.parse = _accel.generateParse(plan, cls)
+            cls.__pynarist_plan__ = plan
+        return plan
 
     def build(self) -> bytes:
-        result = b""
-        for key, value in self.fields.items():
-            if hasattr(self, key):
-                result += getImpl(value).build(getattr(self, key))
-        return result
+        # frozen models replace this with the cached `encoded()`
+        plan = self.__pynarist_plan__ or self.compile()
+        if plan.build is not None:
+            return plan.build(self)
+        return self._buildSteps()
+
+    def buildParallel(
+        self, executor: "Executor", chunkSize: int | None = None
+    ) -> bytes:
+        """
+        The output of `build()`, with the elements of the record's long
+        vectors of nested records or strings built on `executor` in chunks
+        of `chunkSize`. Process pools pickle every element they are sent,
+        which costs more than building it unless elements are large; thread
+        pools only run in parallel on free-threaded builds of Python.
+        """
+        from pynarist._parallel import PARALLEL_CHUNK_SIZE
+
+        return self._buildSteps(executor, chunkSize or PARALLEL_CHUNK_SIZE)
+
+    def _buildSteps(
+        self, executor: "Executor | None" = None, chunkSize: int = 0
+    ) -> bytes:
+        plan = self.compile()
+        result: list = [b""]
+        presence = 0
+        for step in plan.steps:
+            if type(step) is Run:
+                result.append(self._buildRun(plan, step))
+            elif type(step) is OptionalField:
+                value = getattr(self, step.name, None)
+                if value is not None:
+                    presence |= step.mask
+                    result.append(step.impl.build(value))
+            elif executor is not None:
+                from pynarist._parallel import buildChunks
+
+                key, impl = step
+                result += buildChunks(impl, self._required(key), executor, chunkSize)
+            else:
+                key, impl = step
+                result.append(impl.build(self._required(key)))
+        if executor is not None:
+            from pynarist._parallel import resolve
+
+            result = resolve(result)
+        if plan.presence:
+            result[0] = presence.to_bytes(plan.presence, "little")
+        if plan.version:
+            body = b"".join(result)
+            return VERSION_HEADER.pack(plan.version, plan.presence, len(body)) + body
+        return b"".join(result)
+
+    def _buildRun(self, plan: Plan, run: Run) -> bytes:
+        try:
+            return run.pack(self)
+        except (AttributeError, struct.error):
+            pass
+        # one field at a time, so a bad value raises the error of its impl
+        return b"".join(
+            plan.impls[key].build(self._required(key)) for key, _ in run.layout
+        )
+
+    def _required(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise BuildError.new(
+                f"{type(self).__name__}.{key} is missing",
+                "use optional[...] for fields that may be absent",
+            ) from None
 
     @classmethod
-    def parse(cls, data: bytes) -> Self:
-        return cls.parseWithSize(data)[0]
+    def fingerprint(cls) -> int:
+        """
+        The 64-bit hash of the model's schema: its name, byte order and the
+        names and types of its fields, nested models included.
+        """
+        key = cls.__dict__.get("__pynarist_fingerprint__")
+        if key is None:
+            key = cls.__pynarist_fingerprint__ = fingerprint(cls)
+        return key
+
+    def buildFramed(self) -> bytes:
+        """
+        Build the record prefixed with the fingerprint of its model, to be
+        read back with `parseFramed()` without knowing the model up front.
+        """
+        return FRAME_HEADER.pack(self.fingerprint()) + self.build()
+
+    def buildTo(self, stream: BinaryIO) -> None:
+        """
+        Write the record to a binary stream. Iterators given for `vector`
+        and `chunked` fields are consumed lazily while writing.
+        """
+        plan = self.__pynarist_plan__ or self.compile()
+        if self.__pynarist_frozen__ or plan.version:
+            # versioned records are prefixed with their length, so they are
+            # built first
+            stream.write(self.build())
+            return
+        if plan.presence:
+            presence = 0
+            for step in plan.steps:
+                if type(step) is OptionalField:
+                    if getattr(self, step.name, None) is not None:
+                        presence |= step.mask
+            stream.write(presence.to_bytes(plan.presence, "little"))
+
+        for step in plan.steps:
+            if type(step) is Run:
+                stream.write(self._buildRun(plan, step))
+            elif type(step) is OptionalField:
+                value = getattr(self, step.name, None)
+                if value is not None:
+                    buildTo(step.impl, value, stream)
+            else:
+                key, impl = step
+                buildTo(impl, self._required(key), stream)
+
+    @classmethod
+    def patch(cls, data: bytes | bytearray, **values) -> bytes | bytearray:
+        """
+        Replace fields of an encoded record without parsing and rebuilding
+        the rest of it. Fixed-width fields are written at their offset, and
+        variable-width ones are spliced in; `None` removes an optional field.
+
+        A bytearray is patched in place and returned; for bytes, a patched
+        copy is returned. Records of versioned models must have been written
+        by the model's own version.
+        """
+        plan = cls.__pynarist_plan__ or cls.compile()
+        unknown = values.keys() - cls.fields.keys()
+        if unknown:
+            raise UsageError.new(f"Unknown field: {unknown.pop()}")
+        buffer = data if isinstance(data, bytearray) else bytearray(data)
+
+        # find the (start, end, encoded) replacement of every field first,
+        # as splicing moves the fields after it
+        edits = []
+        pending = len(values)
+        base = 0
+        if plan.version:
+            base = VERSION_HEADER.size
+            header = VERSION_HEADER.unpack_from(buffer) if len(buffer) >= base else None
+            if header is None or header[:2] != (plan.version, plan.presence):
+                raise UsageError.new(
+                    f"cannot patch a record that is not of {cls.__name__} version {plan.version}",
+                    "parse and build records of other versions instead",
+                )
+        offset = base + plan.presence
+        presence = readPresence(buffer, plan.presence, base)
+        with memoryview(buffer) as view:
+            for step, skipper in zip(plan.steps, plan.skips):
+                if not pending:
+                    break
+                if skipper is None:
+                    for key in values:
+                        span = step.spans.get(key)  # type: ignore
+                        if span is not None:
+                            start = offset + span[0]
+                            encoded = plan.impls[key].build(values[key])
+                            edits.append((start, start + span[1], encoded))
+                            pending -= 1
+                    offset += step.format.size  # type: ignore
+                    if offset > len(view):
+                        raise ParseError.new("record is shorter than its fields")
+                    continue
+
+                if type(step) is not OptionalField:
+                    key, impl = step  # type: ignore
+                    size = skipAt(skipper, view, offset)
+                    if key in values:
+                        edits.append((offset, offset + size, impl.build(values[key])))
+                        pending -= 1
+                    offset += size
+                    continue
+
+                size = skipAt(skipper, view, offset) if presence & step.mask else 0
+                if step.name in values:
+                    value = values[step.name]
+                    if value is None:
+                        presence &= ~step.mask
+                        encoded = b""
+                    else:
+                        presence |= step.mask
+                        encoded = step.impl.build(value)
+                    edits.append((offset, offset + size, encoded))
+                    pending -= 1
+                offset += size
+
+        for start, end, encoded in reversed(edits):
+            buffer[start:end] = encoded
+        if plan.presence:
+            buffer[base : base + plan.presence] = presence.to_bytes(
+                plan.presence, "little"
+            )
+        if plan.version:
+            length = header[2] + sum(  # type: ignore
+                len(encoded) - (end - start) for start, end, encoded in edits
+            )
+            VERSION_HEADER.pack_into(buffer, 0, plan.version, plan.presence, length)
+        return data if buffer is data else bytes(buffer)
 
     @classmethod
-    def parseWithSize(cls, data: bytes) -> tuple[Self, int]:
-        result = {}
-        total_size = 0
-        for key, value in cls.fields.items():
-            impl = getImpl(value)
-            result[key], size = impl.parseWithSize(data)
-            total_size += size
-            data = data[size:]
-        return cls(**result), total_size
+    def parse(cls, data: bytes, limits: ParseLimits | None = None) -> Self:
+        return cls.parseWithSize(data, limits)[0]
+
+    @classmethod
+    def parseWithSize(
+        cls, data: bytes, limits: ParseLimits | None = None
+    ) -> tuple[Self, int]:
+        if limits is not None:
+            with applyLimits(limits):
+                return cls.parseWithSize(data)
+
+        plan = cls.__pynarist_plan__ or cls.compile()
+        # a memoryview makes every nested slice free instead of a copy
+        view = memoryview(data)
+        if plan.version:
+            return cls._parseVersioned(plan, view)
+        if plan.parse is not None:
+            return plan.parse(view, 0)
+        return cls._parseSteps(plan, view, 0)
+
+    @classmethod
+    def _parseVersioned(cls, plan: Plan, view: memoryview) -> tuple[Self, int]:
+        start = VERSION_HEADER.size
+        if len(view) < start:
+            raise ParseError.new("record is shorter than its version header")
+        writer, presence, length = VERSION_HEADER.unpack_from(view)
+        end = start + length
+        if len(view) < end:
+            raise ParseError.new(
+                f"record of {length} bytes is cut short after {len(view) - start}"
+            )
+        body = plan
+        if writer != plan.version or presence != plan.presence:
+            body = cls._versionPlan(writer, presence)
+        # newer fields are cut off with the envelope
+        view = view[:end]
+        if body.parse is not None:
+            record, size = body.parse(view, start)
+        else:
+            record, size = cls._parseSteps(body, view, start)
+        if size != end and writer <= plan.version:
+            raise ParseError.new(
+                f"record of {cls.__name__} version {writer} has {end - size} bytes past its fields"
+            )
+        return record, end
+
+    @classmethod
+    def _versionPlan(cls, writer: int, presence: int) -> Plan:
+        # the plan for the body of records written by version `writer`:
+        # the fields both versions know, after a bitmap of `presence` bytes
+        key = (min(writer, cls.__pynarist_version__), presence)
+        plan = cls.__pynarist_versions__.get(key)
+        if plan is None:
+            if writer < 1:
+                raise ParseError.new(f"record of {cls.__name__} has version 0")
+            plan = compileModel(cls, key[0], presence)
+            if _accel.ENABLED:
+                plan.parse = _accel.generateParse(plan, cls)
+            cls.__pynarist_versions__[key] = plan
+        return plan
+
+    @classmethod
+    def _parseSteps(
+        cls, plan: Plan, view: memoryview, offset: int
+    ) -> tuple[Self, int]:
+        state = activeLimits.get()
+        if state is not None:
+            state.enter()
+        result: dict = {}
+        presence = readPresence(view, plan.presence, offset)
+        offset += plan.presence
+        for step in plan.steps:
+            if type(step) is Run:
+                step.unpack(step.format.unpack_from(view, offset), result)
+                offset += step.format.size
+            elif type(step) is OptionalField:
+                if presence & step.mask:
+                    result[step.name], size = step.impl.parseWithSize(view[offset:])
+                    offset += size
+                else:
+                    result[step.name] = None
+            else:
+                key, impl = step
+                result[key], size = impl.parseWithSize(view[offset:])
+                offset += size
+        for key in plan.deprecated:
+            del result[key]
+        if state is not None:
+            state.exit()
+        return cls(**result), offset
+
+    @classmethod
+    def parseAs(
+        cls, data: bytes, target: Any = dict, limits: ParseLimits | None = None
+    ) -> Any:
+        """
+        Parse a record straight into `target`: a dict, a tuple of the fields
+        in declaration order, or an instance of a class taking the fields as
+        keyword arguments, such as a dataclass. No records are created.
+        """
+        return cls.parseAsWithSize(data, target, limits)[0]
+
+    @classmethod
+    def parseAsWithSize(
+        cls, data: bytes, target: Any = dict, limits: ParseLimits | None = None
+    ) -> tuple[Any, int]:
+        if limits is not None:
+            with applyLimits(limits):
+                return cls.parseAsWithSize(data, target)
+        parse = cls.__pynarist_shapes__.get(("parse", target)) or cls._parser(target)
+        return parse(memoryview(data), 0)
+
+    @classmethod
+    def _parser(cls, target: Any) -> Callable[[memoryview, int], tuple[Any, int]]:
+        parse = cls.__pynarist_shapes__.get(("parse", target))
+        if parse is not None:
+            return parse
+        plan = cls.compile()
+        if _accel.ENABLED and not plan.version:
+            parse = _accel.generateParse(plan, cls, target)
+        else:
+
+            def parse(view: memoryview, offset: int) -> tuple[Any, int]:
+                record, size = cls.parseWithSize(view[offset:])
+                return convert(record, target), offset + size
+
+        cls.__pynarist_shapes__[("parse", target)] = parse
+        return parse
+
+    @classmethod
+    def buildFrom(cls, value: Any) -> bytes:
+        """
+        Build a record from a dict, a tuple of the fields in declaration
+        order, or an object with the fields as attributes, such as a
+        dataclass, as if it were a record of the model. Nested records may
+        take the same form, except in unions, whose members are told apart
+        by their type.
+        """
+        if isinstance(value, dict):
+            shape = dict
+        elif isinstance(value, tuple):
+            shape = tuple
+        else:
+            shape = object
+        build = cls.__pynarist_shapes__.get(("build", shape)) or cls._builder(shape)
+        return build(value)
+
+    @classmethod
+    def _builder(cls, shape: type) -> Callable[[Any], bytes]:
+        build = cls.__pynarist_shapes__.get(("build", shape))
+        if build is not None:
+            return build
+
+        def build(value: Any) -> bytes:
+            # values of other forms, or that the fast path cannot read
+            return toModel(cls, value).build()
+
+        if _accel.ENABLED:
+            build = _accel.generateBuild(cls.compile(), cls, build, shape)
+        cls.__pynarist_shapes__[("build", shape)] = build
+        return build
+
+    @classmethod
+    def parseStream(cls) -> ParseStream:
+        plan = cls.compile()
+        if plan.version:
+            header = yield VERSION_HEADER.size
+            body = yield VERSION_HEADER.unpack(header)[2]
+            return cls._parseVersioned(plan, memoryview(bytes(header) + bytes(body)))[0]
+
+        state = activeLimits.get()
+        if state is not None:
+            state.enter()
+        result: dict = {}
+        presence = 0
+        if plan.presence:
+            presence = int.from_bytes((yield plan.presence), "little")
+        for step in plan.steps:
+            if type(step) is Run:
+                step.unpack(step.format.unpack((yield step.format.size)), result)
+            elif type(step) is OptionalField:
+                if presence & step.mask:
+                    result[step.name] = yield from step.impl.parseStream()
+                else:
+                    result[step.name] = None
+            else:
+                key, impl = step
+                result[key] = yield from impl.parseStream()
+        for key in plan.deprecated:
+            del result[key]
+        if state is not None:
+            state.exit()
+        return cls(**result)
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}({', '.join(f'{k}={v!r}' for k, v in self.__dict__.items() if k in self.fields)})"
@@ -65,3 +631,52 @@ class Model:
             getattr(self, key, None) == getattr(other, key, None)
             for key in self.fields
         )
+
+    def encoded(self) -> bytes:
+        """
+        The output of `build()`, cached on records of hashable models.
+        """
+        if not self.__pynarist_hashable__:
+            return self.build()
+        encoded = self.__dict__.get("__pynarist_encoded__")
+        if encoded is None:
+            encoded = self.__dict__["__pynarist_encoded__"] = Model.build(self)
+        return encoded
+
+    def encodedSize(self) -> int:
+        """
+        The length of `encoded()`.
+        """
+        return len(self.encoded())
+
+    # the methods of hashable models
+
+    def _encodedSetattr(self, key: str, value) -> None:
+        object.__setattr__(self, key, value)
+        self.__dict__.pop("__pynarist_encoded__", None)
+
+    def _encodedDelattr(self, key: str) -> None:
+        object.__delattr__(self, key)
+        self.__dict__.pop("__pynarist_encoded__", None)
+
+    def _encodedEq(self, other: object) -> bool:
+        if type(self) is not type(other):
+            return False
+        return self.encoded() == other.encoded()  # type: ignore
+
+    def _encodedHash(self) -> int:
+        return hash(self.encoded())
+
+    # the methods of frozen models
+
+    def _frozenSetattr(self, key: str, value) -> None:
+        raise UsageError.new(
+            f"cannot assign {type(self).__name__}.{key}: the model is frozen",
+            "create a new record instead",
+        )
+
+    def _frozenDelattr(self, key: str) -> None:
+        raise UsageError.new(
+            f"cannot delete {type(self).__name__}.{key}: the model is frozen",
+            "create a new record instead",
+        )
@@ -0,0 +1,87 @@
+from unittest import TestCase, mock
+from pynarist import (
+    Model,
+    varchar,
+    byte,
+    short,
+    long,
+    double,
+    char,
+    vector,
+    array,
+    fixedstring,
+)
+from pynarist import _accel
+from pynarist._errors import BuildError, UsageError
+
+
+class Address(Model):
+    x0: byte
+    x1: byte
+
+
+class Log(Model):
+    address: Address
+    identity: varchar
+    request: str
+    tag: char
+    code: short
+    size: long
+    scores: vector[double]
+    pair: array[short, 2]
+    country: fixedstring[2]
+
+
+class Logs(Model):
+    logs: vector[Log]
+
+
+class Custom(Model):
+    a: int
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.seen = True
+
+
+def make_log(i: int) -> Log:
+    return Log(
+        address=Address(x0=byte(i), x1=byte(-i)),
+        identity=varchar(f"user_{i}"),
+        request="GET /" + "é" * i,
+        tag=char("x"),
+        code=short(200 + i),
+        size=long(i * 1000),
+        scores=vector[double](*(double(x / 3) for x in range(i))),
+        pair=array[short, 2](short(i), short(i + 1)),
+        country=fixedstring[2]("nl"),
+    )
+
+
+def generic(model: type, data: bytes):
+    with mock.patch.object(model.compile(), "parse", None):
+        return model.parseWithSize(data)
+
+
+class TestAccel(TestCase):
+    def setUp(self):
+        if not _accel.ENABLED:
+            self.skipTest("accelerator disabled")
+
+    def test_identical_output(self):
+        logs = Logs(logs=vector[Log](*(make_log(i) for i in range(10))))
+        data = logs.build()
+        self.assertEqual(data, logs._buildSteps())
+        self.assertEqual(Logs.parseWithSize(data), generic(Logs, data))
+        self.assertEqual(Logs.parse(data), logs)
+
+    def test_fallback(self):
+        with self.assertRaises(BuildError):
+            Address(x0=byte(1)).build()
+        with self.assertRaises(UsageError):
+            Address(x0=byte(1), x1=byte(300)).build()
+
+    def test_custom_init(self):
+        parsed = Custom.parse(Custom(a=1).build())
+        self.assertEqual(parsed.a, 1)
+        self.assertTrue(parsed.seen)
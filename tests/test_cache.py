@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase, mock
+from pynarist import Model, varchar, short
+from pynarist import _cache
+
+
+class TestCache(TestCase):
+    def test_compile_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.object(_cache, "DIRECTORY", directory):
+                code = _cache.compileCached("x = 1", "<test>")
+                (entry,) = os.listdir(directory)
+                self.assertTrue(entry.endswith(sys.implementation.cache_tag + ".code"))
+
+                with mock.patch.object(_cache, "compile", side_effect=AssertionError):
+                    self.assertEqual(_cache.compileCached("x = 1", "<test>"), code)
+
+                class Cached(Model):
+                    name: varchar
+                    code: short
+
+                record = Cached(name=varchar("a"), code=short(1))
+                self.assertEqual(Cached.parse(record.build()), record)
+
+    def test_unwritable(self):
+        with tempfile.NamedTemporaryFile() as file:
+            # a file where the directory should be
+            with mock.patch.object(_cache, "DIRECTORY", file.name):
+                namespace: dict = {}
+                exec(_cache.compileCached("x = 1", "<test>"), namespace)
+                self.assertEqual(namespace["x"], 1)
+
+
+class TestImport(TestCase):
+    def test_lazy_imports(self):
+        # modules that are slow to import and only needed by some features
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, pynarist; "
+                "print(*sorted({'inspect', 'hashlib', 'numpy', 'concurrent.futures', 'socket'} & set(sys.modules)))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "")
@@ -0,0 +1,84 @@
+import socket
+import threading
+from unittest import TestCase
+from pynarist import Model, FramedSocket, BufferPool, ParseLimits, blob, varchar, short, vector
+from pynarist._errors import ParseError
+from pynarist._framing import MESSAGE_HEADER
+
+
+class Reading(Model):
+    sensor: varchar
+    values: vector[short]
+
+
+class Thumbnail(Model):
+    id: short
+    image: blob
+
+
+class TestFraming(TestCase):
+    def setUp(self):
+        left, right = socket.socketpair()
+        self.sender = FramedSocket(left, Reading)
+        self.receiver = FramedSocket(right, Reading)
+        self.addCleanup(self.sender.close)
+        self.addCleanup(self.receiver.close)
+
+    def test_roundtrip(self):
+        readings = [
+            Reading(sensor=varchar(f"s{i}"), values=[short(x) for x in range(i * 100)])
+            for i in range(20)
+        ]
+
+        def send():
+            for reading in readings:
+                self.sender.send(reading)
+            self.sender.socket.shutdown(socket.SHUT_WR)
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        self.assertEqual(list(self.receiver), readings)
+        thread.join()
+        # every record was decoded into the same pooled buffer
+        self.assertEqual(len(self.receiver.pool.buffers), 1)
+
+    def test_blob(self):
+        left, right = socket.socketpair()
+        pool = BufferPool(size=16)
+        with FramedSocket(left, Thumbnail) as sender, FramedSocket(right, Thumbnail, pool) as receiver:
+            image = bytes(range(256)) * 20
+            sender.send(Thumbnail(id=short(1), image=memoryview(image)))
+            received = receiver.receive()
+            self.assertEqual(received.image, image)
+            # the buffer is still referenced by the record, so it is not reused
+            self.assertEqual(pool.buffers, [])
+            del received
+            sender.send(Thumbnail(id=short(2), image=b""))
+            self.assertEqual(receiver.receive().id, 2)
+
+    def test_errors(self):
+        self.sender.socket.sendall(MESSAGE_HEADER.pack(3) + b"\x05ab")
+        with self.assertRaises(ParseError):
+            self.receiver.receive()
+
+        self.receiver.limits = ParseLimits(maxVectorLength=1)
+        self.sender.send(Reading(sensor=varchar("a"), values=[short(1), short(2)]))
+        with self.assertRaises(ParseError):
+            self.receiver.receive()
+
+        self.sender.socket.sendall(MESSAGE_HEADER.pack(8) + b"\x01a")
+        self.sender.socket.shutdown(socket.SHUT_WR)
+        with self.assertRaises(ParseError):
+            self.receiver.receive()
+
+    def test_oversized(self):
+        # a body that would be read as a message of its own
+        record = Reading(sensor=varchar("a"), values=[]).build()
+        body = MESSAGE_HEADER.pack(len(record)) + record
+        self.receiver.maxLength = len(record)
+        self.sender.socket.sendall(MESSAGE_HEADER.pack(len(body)) + body)
+        with self.assertRaises(ParseError):
+            self.receiver.receive()
+        # the body of the refused message is still in the socket
+        with self.assertRaises(ParseError):
+            self.receiver.receive()
@@ -1,5 +1,6 @@
+import io
 import struct
-from unittest import TestCase
+from unittest import TestCase, mock
 from pynarist import (
     Model,
     char,
@@ -12,8 +13,21 @@ from pynarist import (
     fixedstring,
     array,
     vector,
+    union,
+    delta,
+    bits,
+    packed,
+    interned,
+    undecoded,
+    blob,
+    fixedbytes,
+    chunked,
+    endian,
+    null,
+    Decoder,
 )
-from pynarist._errors import UsageError
+from pynarist._errors import ParseError, UsageError
+from pynarist import _impls
 from pynarist._impls import getImpl, registerImpl
 
 
@@ -72,3 +86,259 @@ class TestImpl(TestCase):
 
         with self.assertRaises(AttributeError):
             getImpl(str).build(123)
+
+    def test_union(self):
+        class Ping(Model):
+            id: int
+
+        class Text(Model):
+            body: varchar
+
+        message = union[Ping, Text, short, str]
+        impl = getImpl(message)
+        self.assertEqual(impl.build(Ping(id=1)), b"\x00\x01\x00\x00\x00")
+        self.assertEqual(impl.build(Text(body=varchar("hi"))), b"\x01\x02hi")
+        self.assertEqual(impl.build(short(2)), b"\x02\x02\x00")
+        self.assertEqual(impl.build("x"), b"\x03\x01\x00\x00\x00x")
+        self.assertEqual(impl.parse(b"\x01\x02hi"), Text(body=varchar("hi")))
+        value, size = impl.parseWithSize(b"\x02\x02\x00")
+        self.assertEqual((type(value), value, size), (short, 2, 3))
+        with self.assertRaises(UsageError):
+            impl.build(1.0)
+        with self.assertRaises(ParseError):
+            impl.parse(b"\x09")
+
+        class Envelope(Model):
+            seq: short
+            message: union[Ping, Text]
+
+        stream = [
+            Envelope(
+                seq=short(i),
+                message=Ping(id=i) if i % 2 else Text(body=varchar(str(i))),
+            )
+            for i in range(4)
+        ]
+        data = b"".join(x.build() for x in stream)
+        self.assertEqual(Decoder(Envelope).feed(data), stream)
+        self.assertEqual(Envelope.parse(stream[1].build()), stream[1])
+
+    def test_union_roundtrip(self):
+        class Ping(Model):
+            id: int
+
+        # members with a value type, then members matched by what they parse to
+        kinds = [
+            (Ping, Ping(id=1)),
+            (short, short(2)),
+            (long, long(3)),
+            (byte, byte(4)),
+            (bits[3], bits[3](5)),
+            (half, half(1.5)),
+            (double, double(2.5)),
+            (bool, True),
+            (char, char("c")),
+            (varchar, varchar("v")),
+            (fixedstring[3], fixedstring[3]("abc")),
+            (vector[short], vector[short](short(1))),
+            (array[short, 2], array[short, 2](short(1), short(2))),
+            (chunked[short], chunked[short](short(1))),
+            (endian[int, ">"], 9),
+            (blob, b"blob"),
+            (null, null()),
+        ]
+        plain = [
+            (int, 7),
+            (float, 1.25),
+            (str, "s"),
+            (fixedbytes[2], b"fb"),
+            (delta[vector[long]], [1, 2, 3]),
+        ]
+        # members sharing a plain type each go in a union of their own
+        text = [(interned[varchar], "i"), (undecoded[str], b"u")]
+        flags = [(packed[vector[bool]], [True, False])]
+        for group in (kinds, plain, text, flags):
+            members = union[tuple(member for member, _ in group)]  # type: ignore
+
+            class Envelope(Model):
+                message: members  # type: ignore
+
+            impl = getImpl(members)
+            for index, (member, value) in enumerate(group):
+                with self.subTest(member=member):
+                    data = impl.build(value)
+                    self.assertEqual(data[0], index)
+                    self.assertEqual(impl.build(impl.parse(data)), data)
+                    record = Envelope(message=value).build()
+                    self.assertEqual(Envelope.parse(record).build(), record)
+                    self.assertEqual(Decoder(Envelope).feed(record)[0].build(), record)
+
+        self.assertEqual(getImpl(union[varchar, vector[short]]).build([1]), b"\x01\x01\x00\x00\x00\x01\x00")
+
+    def test_union_parametrized(self):
+        impl = getImpl(union[vector[short], varchar])
+        self.assertEqual(
+            impl.build(vector[short](short(1))), b"\x00\x01\x00\x00\x00\x01\x00"
+        )
+        self.assertEqual(impl.build(varchar("a")), b"\x01\x01a")
+
+    def test_delta(self):
+        impl = getImpl(delta[vector[long]])
+        stamps = [1_700_000_000_000 + 40 * i for i in range(100)]
+        data = impl.build(stamps)
+        self.assertEqual(len(data), 4 + 6 + 99)
+        self.assertEqual(impl.parseWithSize(data + b"tail"), (stamps, len(data)))
+
+        # differences wrap around like the fixed-width elements
+        extremes = [-(2**63), 2**63 - 1, 0, -1, 2**63 - 1]
+        self.assertEqual(impl.parse(impl.build(extremes)), extremes)
+        impl = getImpl(delta[array[short, 3]])
+        self.assertEqual(impl.build([-32768, 32767, 32767]), b"\xff\xff\x03\x01\x00")
+        self.assertEqual(impl.parse(b"\xff\xff\x03\x01\x00"), [-32768, 32767, 32767])
+
+        class Series(Model):
+            stamps: delta[vector[long]]
+            flags: delta[array[byte, 2]]
+
+        series = Series(stamps=stamps, flags=[-128, 127])
+        data = series.build()
+        self.assertEqual(Series.parse(data), series)
+        self.assertEqual(Decoder(Series).feed(data * 2), [series, series])
+
+        with self.assertRaises(UsageError):
+            getImpl(delta[vector[short]]).build([40000])
+        with self.assertRaises(UsageError):
+            delta[vector[double]]
+        with self.assertRaises(ParseError):
+            getImpl(delta[vector[long]]).parse(data[:20])
+        with self.assertRaises(ParseError):
+            getImpl(delta[array[byte, 1]]).parse(b"\x80\x80\x01")
+
+    def test_delta_numpy(self):
+        if _impls._importNumpy() is None:
+            self.skipTest("numpy not installed")
+        impl = getImpl(delta[vector[short]])
+        values = [(i * 7919) % 65536 - 32768 for i in range(500)]
+        data = impl.build(values)
+        self.assertEqual(impl.parseWithSize(data), (values, len(data)))
+        with mock.patch.object(_impls, "DELTA_NUMPY_THRESHOLD", 10**9):
+            self.assertEqual(impl.parseWithSize(data), (values, len(data)))
+        with self.assertRaises(ParseError):
+            impl.parse(data[:-1])
+
+    def test_packed(self):
+        impl = getImpl(packed[vector[bool]])
+        flags = [True, False, True, True, False, False, False, False, True]
+        self.assertEqual(impl.build(flags), b"\x09\x00\x00\x00\x0d\x01")
+        self.assertEqual(impl.parseWithSize(b"\x09\x00\x00\x00\x0d\x01"), (flags, 6))
+        self.assertEqual(impl.build([]), b"\x00\x00\x00\x00")
+        # one-bit integers stay integers
+        impl = getImpl(packed[vector[bits[1]]])
+        parsed = impl.parse(impl.build([1, 0, 1]))
+        self.assertEqual(parsed, [1, 0, 1])
+        self.assertNotIn(bool, map(type, parsed))
+
+        impl = getImpl(packed[array[bits[3], 3]])
+        self.assertEqual(impl.build([1, 7, 2]), (1 | 7 << 3 | 2 << 6).to_bytes(2, "little"))
+        self.assertEqual(impl.parse((1 | 7 << 3 | 2 << 6).to_bytes(2, "little")), [1, 7, 2])
+        self.assertEqual(impl.minSize(), 2)
+
+        self.assertEqual(getImpl(bits[12], "<").build(0xABC), b"\xbc\x0a")
+        self.assertEqual(getImpl(bits[12], ">").parseWithSize(b"\x0a\xbc"), (0xABC, 2))
+
+        class Sample(Model):
+            valid: packed[vector[bool]]
+            levels: packed[vector[bits[5]]]
+            mode: bits[2]
+
+        sample = Sample(
+            valid=[i % 3 == 0 for i in range(100)],
+            levels=[i % 32 for i in range(70)],
+            mode=3,
+        )
+        data = sample.build()
+        self.assertEqual(len(data), 4 + 13 + 4 + 44 + 1)
+        self.assertEqual(Sample.parse(data), sample)
+        self.assertEqual(Decoder(Sample).feed(data), [sample])
+
+        with self.assertRaises(UsageError):
+            getImpl(packed[vector[bits[3]]]).build([8])
+        with self.assertRaises(UsageError):
+            getImpl(packed[vector[bool]]).build([2])
+        with self.assertRaises(UsageError):
+            getImpl(bits[2]).build(4)
+        with self.assertRaises(UsageError):
+            packed[vector[int]]
+        with self.assertRaises(ParseError):
+            getImpl(packed[vector[bool]]).parse(b"\x09\x00\x00\x00\x0d")
+
+    def test_text_modes(self):
+        class Entry(Model):
+            user: interned[varchar]
+            path: interned[str]
+            body: undecoded[str]
+            country: undecoded[fixedstring[2]]
+
+        entry = Entry(
+            user=varchar("alice"), path="/é", body="x" * 10, country=b"nl"
+        )
+        data = entry.build()
+        self.assertEqual(
+            data,
+            Entry(
+                user=varchar("alice"),
+                path="/é",
+                body="x" * 10,
+                country=fixedstring[2]("nl"),
+            ).build(),
+        )
+        first, second = Entry.parse(data), Entry.parse(data)
+        self.assertEqual(first.path, "/é")
+        self.assertIs(first.user, second.user)
+        self.assertIsInstance(first.body, memoryview)
+        self.assertEqual(bytes(first.body), b"x" * 10)
+        self.assertEqual(first.country, b"nl")
+
+        (streamed,) = Decoder(Entry).feed(data)
+        self.assertIs(streamed.user, first.user)
+        self.assertEqual(streamed.body, b"x" * 10)
+
+        # bytes are written as they are, with only their length checked
+        self.assertEqual(getImpl(undecoded[varchar]).build(b"\xc3\xa9"), b"\x02\xc3\xa9")
+        with self.assertRaises(UsageError):
+            getImpl(undecoded[varchar]).build(b"x" * 256)
+        with self.assertRaises(UsageError):
+            Entry(user=varchar("a"), path="", body=b"", country=b"nld").build()
+        with self.assertRaises(UsageError):
+            interned[int]
+
+    def test_bytes(self):
+        class Message(Model):
+            id: short
+            thumbnail: blob
+            digest: fixedbytes[4]
+
+        message = Message(
+            id=short(1), thumbnail=memoryview(b"\x89PNG"), digest=bytearray(b"abcd")
+        )
+        data = message.build()
+        self.assertEqual(data, b"\x01\x00\x04\x00\x00\x00\x89PNGabcd")
+        parsed = Message.parse(data)
+        self.assertEqual(parsed, Message(id=short(1), thumbnail=b"\x89PNG", digest=b"abcd"))
+        self.assertIsInstance(parsed.thumbnail, memoryview)
+        self.assertIs(parsed.thumbnail.obj, data)
+        self.assertEqual(Decoder(Message).feed(data), [parsed])
+
+        self.assertEqual(getImpl(blob).build(b""), b"\x00\x00\x00\x00")
+        self.assertEqual(getImpl(blob).parseWithSize(b"\x01\x00\x00\x00xy"), (b"x", 5))
+        buffer = bytearray(b"wxyz")
+        built = getImpl(fixedbytes[4]).build(buffer)
+        buffer[0] = 0
+        self.assertEqual((type(built), built), (bytes, b"wxyz"))
+        stream = io.BytesIO()
+        message.buildTo(stream)
+        self.assertEqual(stream.getvalue(), data)
+        with self.assertRaises(UsageError):
+            getImpl(fixedbytes[4]).build(b"abc")
+        with self.assertRaises(ParseError):
+            getImpl(blob).parse(b"\x09\x00\x00\x00xy")
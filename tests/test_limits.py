@@ -0,0 +1,106 @@
+import struct
+from unittest import TestCase
+from pynarist import Model, Decoder, ParseLimits, varchar, short, vector, array
+from pynarist._errors import ParseError
+from pynarist._impls import ZERO_WIDTH_LENGTH, getImpl, registerImpl
+
+
+class Item(Model):
+    name: varchar
+    code: short
+
+
+class Items(Model):
+    items: vector[Item]
+
+
+class Outer(Model):
+    inner: Items
+
+
+class TestLimits(TestCase):
+    def test_hostile_length(self):
+        # a count of ~4 billion must fail before any element is decoded
+        with self.assertRaises(ParseError):
+            Items.parse(b"\xff\xff\xff\xff\x00\x00\x00\x00")
+
+        with self.assertRaises(ParseError):
+            getImpl(str).parse(struct.pack("I", 100) + b"abc")
+
+        with self.assertRaises(ParseError):
+            getImpl(varchar).parse(b"\x05abc")
+
+    def test_zero_width_length(self):
+        class Empty(Model):
+            pass
+
+        class Holder(Model):
+            empties: vector[Empty]
+            pairs: vector[array[short, 0]]
+
+        # nothing in the input bounds these counts, so they are capped
+        for data in (b"\xff\xff\xff\xff", b"\x00\x00\x00\x00\xff\xff\xff\xff"):
+            with self.assertRaises(ParseError):
+                Holder.parse(data)
+        data = Holder(empties=[Empty()] * ZERO_WIDTH_LENGTH, pairs=[]).build()
+        self.assertEqual(len(Holder.parse(data).empties), ZERO_WIDTH_LENGTH)
+
+    def test_minimal_impl(self):
+        # impls registered with only the baseline protocol, without minSize()
+        class Tag:
+            pass
+
+        class ImplTag:
+            def build(self, source):
+                return b"\x01"
+
+            def parse(self, source):
+                return Tag()
+
+            def parseWithSize(self, source):
+                return Tag(), 1
+
+        registerImpl(Tag, ImplTag())
+
+        class Tagged(Model):
+            tags: vector[Tag]
+
+        class Tags(Model):
+            items: vector[Tagged]
+
+        self.assertEqual(len(Tagged.parse(b"\x02\x00\x00\x00\x01\x01").tags), 2)
+        data = b"\x01\x00\x00\x00" + b"\x01\x00\x00\x00\x01"
+        self.assertEqual(len(Tags.parse(data).items), 1)
+
+    def test_vector_length(self):
+        data = Items(items=vector[Item](*[Item(name=varchar("a"), code=short(1))] * 3)).build()
+        self.assertEqual(len(Items.parse(data, ParseLimits(maxVectorLength=3)).items), 3)
+        with self.assertRaises(ParseError):
+            Items.parse(data, ParseLimits(maxVectorLength=2))
+        with self.assertRaises(ParseError):
+            Decoder(Items, ParseLimits(maxVectorLength=2)).feed(data)
+
+    def test_string_bytes(self):
+        data = Items(items=vector[Item](*[Item(name=varchar("abc"), code=short(1))] * 3)).build()
+        Items.parse(data, ParseLimits(maxStringBytes=9))
+        with self.assertRaises(ParseError):
+            Items.parse(data, ParseLimits(maxStringBytes=8))
+
+    def test_depth(self):
+        data = Outer(inner=Items(items=vector[Item]())).build()
+        Outer.parse(data, ParseLimits(maxDepth=2))
+        with self.assertRaises(ParseError):
+            Outer.parse(data, ParseLimits(maxDepth=1))
+        with self.assertRaises(ParseError):
+            Decoder(Outer, ParseLimits(maxDepth=1)).feed(data)
+
+    def test_allocation(self):
+        data = Items(items=vector[Item](*[Item(name=varchar("abc"), code=short(1))] * 3)).build()
+        Items.parse(data, ParseLimits(maxAllocation=100))
+        with self.assertRaises(ParseError):
+            Items.parse(data, ParseLimits(maxAllocation=20))
+
+    def test_limits_per_record(self):
+        data = Item(name=varchar("abc"), code=short(1)).build()
+        decoder = Decoder(Item, ParseLimits(maxStringBytes=3))
+        self.assertEqual(len(decoder.feed(data * 4)), 4)
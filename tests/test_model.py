@@ -1,9 +1,25 @@
 # Licensed under the Apache License: http://www.apache.org/licenses/LICENSE-2.0
 # for more information, see https://github.com/Temps233/pynarist/blob/master/NOTICE.txt
+import struct
+from dataclasses import dataclass
 from unittest import TestCase
-from pynarist import Model, char, long, byte
-from pynarist._errors import UsageError
-from pynarist._impls import varchar
+from pynarist import (
+    Model,
+    Decoder,
+    char,
+    long,
+    byte,
+    short,
+    double,
+    endian,
+    vector,
+    optional,
+    union,
+    since,
+    deprecated,
+)
+from pynarist._errors import BuildError, ParseError, UsageError
+from pynarist._impls import getImpl, varchar
 
 
 class TestModel(TestCase):
@@ -64,3 +80,349 @@ class TestModel(TestCase):
         self.assertEqual(value.name, "Bob")
         self.assertEqual(value.kvpair.first, 1)
         self.assertEqual(value.kvpair.second, "123")
+
+    def test_byteorder(self):
+        class Header(Model, byteorder=">"):
+            magic: int
+            length: short
+            flags: endian[short, "<"]
+            names: vector[varchar]
+
+        header = Header(
+            magic=1, length=short(2), flags=short(3), names=vector[varchar](varchar("a"))
+        )
+        data = header.build()
+        self.assertEqual(
+            data,
+            struct.pack(">ih", 1, 2) + struct.pack("<h", 3) + struct.pack(">I", 1) + b"\x01a",
+        )
+        self.assertEqual(Header.parse(data), header)
+
+        class Sub(Header):
+            extra: byte
+
+        self.assertEqual(Sub.__pynarist_byteorder__, ">")
+
+        with self.assertRaises(UsageError):
+
+            class Bad(Model, byteorder="?"):  # type: ignore
+                a: int
+
+    def test_native_alignment(self):
+        class Inner(Model, byteorder="@"):
+            a: byte
+            b: int
+
+        class Outer(Model, byteorder="@"):
+            c: byte
+            inner: Inner
+            d: short
+
+        self.assertEqual(len(Inner(a=byte(1), b=2).build()), struct.calcsize("@bi"))
+        outer = Outer(c=byte(1), inner=Inner(a=byte(2), b=3), d=short(4))
+        data = outer.build()
+        self.assertEqual(data, struct.pack("@b0ibi0ih0i", 1, 2, 3, 4))
+        self.assertEqual(Outer.parse(data), outer)
+
+    def test_folded_errors(self):
+        class Pair(Model):
+            a: byte
+            b: short
+
+        with self.assertRaises(UsageError):
+            Pair(a=byte(1000), b=short(1)).build()
+        with self.assertRaises(BuildError):
+            Pair(b=short(1)).build()
+
+    def test_optional(self):
+        class Event(Model):
+            kind: byte
+            user: optional[varchar]
+            count: optional[int]
+            size: long
+            tags: optional[vector[short]]
+
+        full = Event(
+            kind=byte(1),
+            user=varchar("bob"),
+            count=3,
+            size=long(4),
+            tags=vector[short](short(5)),
+        )
+        sparse = Event(kind=byte(1), size=long(4))
+        self.assertEqual(sparse.build(), b"\x00\x01" + struct.pack("q", 4))
+        self.assertEqual(full.build()[:1], b"\x07")
+
+        for event in (full, sparse, Event(kind=byte(2), count=0, size=long(1))):
+            parsed = Event.parse(event.build())
+            self.assertEqual(parsed, event)
+            self.assertEqual(parsed.build(), event.build())
+            self.assertEqual(Decoder(Event).feed(event.build()), [event])
+        self.assertIsNone(Event.parse(sparse.build()).user)
+
+        with self.assertRaises(BuildError):
+            Event(kind=byte(1)).build()
+
+    def test_optional_standalone(self):
+        impl = getImpl(vector[optional[short]])
+        data = impl.build([short(1), None])
+        self.assertEqual(data, b"\x02\x00\x00\x00\x01\x01\x00\x00")
+        self.assertEqual(impl.parse(data), [1, None])
+
+    def test_patch(self):
+        class Point(Model, byteorder="@"):
+            x: byte
+            y: long
+
+        class Entry(Model, byteorder="@"):
+            kind: byte
+            origin: Point
+            name: varchar
+            tags: vector[varchar]
+            note: optional[str]
+            status: short
+
+        entry = Entry(
+            kind=byte(1),
+            origin=Point(x=byte(2), y=long(3)),
+            name=varchar("first"),
+            tags=vector[varchar](varchar("a"), varchar("bc")),
+            note=None,
+            status=short(200),
+        )
+        data = entry.build()
+
+        patched = Entry.patch(data, status=short(404), origin=Point(x=byte(5), y=long(6)))
+        self.assertIsInstance(patched, bytes)
+        entry.status, entry.origin = short(404), Point(x=byte(5), y=long(6))
+        self.assertEqual(patched, entry.build())
+
+        buffer = bytearray(data)
+        self.assertIs(Entry.patch(buffer, name=varchar("renamed"), note="hi"), buffer)
+        self.assertEqual(
+            Entry.parse(buffer),
+            Entry(
+                kind=byte(1),
+                origin=Point(x=byte(2), y=long(3)),
+                name=varchar("renamed"),
+                tags=["a", "bc"],
+                note="hi",
+                status=short(200),
+            ),
+        )
+        Entry.patch(buffer, note=None, name=varchar("first"))
+        self.assertEqual(bytes(buffer), data)
+
+        with self.assertRaises(UsageError):
+            Entry.patch(data, missing=1)
+        with self.assertRaises(UsageError):
+            Entry.patch(data, status=short(1 << 20))
+
+        # a cut record is rejected instead of spliced past its end
+        for cut in (len(data) - 1, len(data) - 3, 30, 12):
+            with self.assertRaises(ParseError):
+                Entry.patch(data[:cut], status=short(9))
+        corrupt = bytearray(data)
+        corrupt[data.index(b"first") - 1] = 200  # the length of `name`
+        with self.assertRaises(ParseError):
+            Entry.patch(corrupt, status=short(9))
+
+    def test_hashable(self):
+        class Point(Model, hashable=True):
+            x: short
+            y: short
+
+        class Path(Model, hashable=True):
+            name: varchar
+            points: vector[Point]
+
+        first = Path(name=varchar("a"), points=[Point(x=short(1), y=short(2))])
+        second = Path.parse(first.build())
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second, Point(x=short(1), y=short(2))}), 2)
+        self.assertEqual(first.encoded(), first.build())
+
+        second.name = varchar("b")
+        self.assertNotEqual(first, second)
+        self.assertEqual(second.encoded(), Path(name=varchar("b"), points=first.points).build())
+        del second.name
+        with self.assertRaises(BuildError):
+            hash(second)
+
+        class Plain(Model):
+            x: short
+
+        with self.assertRaises(TypeError):
+            hash(Plain(x=short(1)))
+
+    def test_frozen(self):
+        class Entry(Model, frozen=True):
+            key: varchar
+            value: long
+
+        class Table(Model, frozen=True):
+            entries: vector[Entry]
+
+        class Update(Model):
+            seq: short
+            table: Table
+
+        entry = Entry(key=varchar("a"), value=long(1))
+        table = Table(entries=[entry, Entry(key=varchar("b"), value=long(2))])
+        data = table.build()
+        self.assertIs(table.build(), data)
+        self.assertIs(entry.build(), entry.build())
+        self.assertEqual(table.encodedSize(), len(data))
+        self.assertEqual(data, Model.build(table))
+
+        update = Update(seq=short(1), table=table)
+        self.assertEqual(Update.parse(update.build()), update)
+        self.assertEqual(hash(Table.parse(data)), hash(table))
+
+        with self.assertRaises(UsageError):
+            entry.value = long(2)  # type: ignore
+        with self.assertRaises(UsageError):
+            del entry.key
+        with self.assertRaises(UsageError):
+            Entry(key=varchar("a"), missing=1)  # type: ignore
+
+    def test_versions(self):
+        class EventV1(Model, version=1):
+            kind: short
+            source: varchar
+
+        class EventV2(Model, version=2):
+            kind: short
+            source: deprecated[varchar] = varchar("")
+            weight: since[double, 2] = double(1.0)
+            note: since[optional[str], 2]
+
+        class Batch(Model):
+            events: vector[EventV2]
+
+        old = EventV1(kind=short(1), source=varchar("cli")).build()
+        self.assertEqual(old[:7], b"\x01\x00\x00\x06\x00\x00\x00")
+        event = EventV2.parse(old)
+        self.assertEqual((event.kind, event.weight, event.note), (1, 1.0, None))
+        # deprecated fields are skipped, leaving the default
+        self.assertEqual(event.source, "")
+
+        new = EventV2(kind=short(2), weight=double(0.5), note="n").build()
+        self.assertEqual(EventV1.parseWithSize(new + b"!"), (EventV1(kind=short(2), source=varchar("")), len(new)))
+        self.assertEqual(EventV2.parse(new), EventV2(kind=short(2), weight=double(0.5), note="n"))
+        self.assertEqual(EventV2.compile().skip(memoryview(new + b"!")), len(new))
+        self.assertEqual(list(Decoder(EventV2).feed(new + old)), [EventV2.parse(new), event])
+
+        batch = Batch(events=[EventV2(kind=short(3)), EventV2.parse(new)])
+        self.assertEqual(Batch.parse(batch.build()), batch)
+        self.assertEqual(EventV2.parse(EventV2.patch(new, note="longer")).note, "longer")
+
+        with self.assertRaises(ParseError):
+            EventV2.parse(old[:-1])
+        with self.assertRaises(ParseError):
+            EventV2.parse(b"\x00\x00\x00\x00\x00\x00\x00")
+        with self.assertRaises(UsageError):
+            EventV2.patch(old, kind=short(1))
+        with self.assertRaises(UsageError):
+
+            class Unversioned(Model):
+                weight: since[double, 2] = double(1.0)
+
+        with self.assertRaises(UsageError):
+
+            class NoDefault(Model, version=2):
+                weight: since[double, 2]
+
+        with self.assertRaises(UsageError):
+
+            class Inserted(Model, version=3):
+                a: since[short, 3] = short(0)
+                b: since[short, 2] = short(0)
+
+    def test_shapes(self):
+        class Point(Model):
+            x: short
+            y: short
+
+        class Shape(Model):
+            name: varchar
+            origin: Point
+            points: vector[Point]
+            label: optional[str]
+            anchor: union[Point, short]
+            legacy: deprecated[byte] = byte(7)
+
+        @dataclass
+        class DPoint:
+            x: int
+            y: int
+
+        @dataclass
+        class DShape:
+            name: str
+            origin: DPoint
+            points: list[DPoint]
+            label: str | None
+            anchor: DPoint | int
+            legacy: int
+
+        shape = Shape(
+            name=varchar("tri"),
+            origin=Point(x=short(0), y=short(1)),
+            points=[Point(x=short(i), y=short(-i)) for i in range(3)],
+            label=None,
+            anchor=Point(x=short(5), y=short(5)),
+        )
+        data = shape.build()
+        points = [{"x": i, "y": -i} for i in range(3)]
+        as_dict = {
+            "name": "tri",
+            "origin": {"x": 0, "y": 1},
+            "points": points,
+            "label": None,
+            "anchor": {"x": 5, "y": 5},
+            "legacy": 7,
+        }
+        self.assertEqual(Shape.parseAs(data), as_dict)
+        as_tuple = Shape.parseAs(data, tuple)
+        self.assertEqual(as_tuple, ("tri", (0, 1), [(i, -i) for i in range(3)], None, (5, 5), 7))
+        as_dataclass = Shape.parseAs(data, DShape)
+        self.assertEqual(as_dataclass.points[2], DPoint(2, -2))
+        self.assertEqual(as_dataclass.anchor, DPoint(5, 5))
+        self.assertEqual(Shape.parseAsWithSize(data + b"!", tuple)[1], len(data))
+
+        # union members are only told apart by their type
+        anchor = Point(x=short(5), y=short(5))
+        self.assertEqual(Shape.buildFrom(dict(as_dict, anchor=anchor)), data)
+        self.assertEqual(Shape.buildFrom((*as_tuple[:4], anchor, 7)), data)
+        as_dataclass.anchor = anchor
+        self.assertEqual(Shape.buildFrom(as_dataclass), data)
+        # forms can be mixed, and records taken as they are
+        mixed = dict(
+            as_dict, origin=(0, 1), points=[Point(x=short(0), y=short(0))], anchor=short(1)
+        )
+        self.assertEqual(
+            Shape.parse(Shape.buildFrom(mixed)).points, [Point(x=short(0), y=short(0))]
+        )
+        with self.assertRaises(BuildError):
+            Shape.buildFrom({"name": varchar("tri")})
+
+        class Group(Model):
+            members: union[vector[Point], str]
+
+        group = Group(members=vector[Point](Point(x=short(1), y=short(2))))
+        as_dict = Group.parseAs(group.build())
+        self.assertEqual(as_dict, {"members": [{"x": 1, "y": 2}]})
+        self.assertIs(type(as_dict["members"]), list)
+
+    def test_shapes_versioned(self):
+        class Sample(Model, version=2):
+            value: short
+            scale: since[short, 2] = short(1)
+
+        class SampleV1(Model, version=1):
+            value: short
+
+        data = SampleV1(value=short(3)).build()
+        self.assertEqual(Sample.parseAs(data), {"value": 3, "scale": 1})
+        self.assertEqual(Sample.parse(Sample.buildFrom((3, 2))).scale, 2)
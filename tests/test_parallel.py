@@ -0,0 +1,47 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import TestCase
+from pynarist import Model, varchar, short, long, vector, optional, since
+
+
+class Entry(Model):
+    key: varchar
+    value: long
+
+
+class Table(Model, version=2):
+    name: varchar
+    entries: vector[Entry]
+    keys: vector[varchar]
+    counts: vector[short]
+    note: since[optional[str], 2]
+
+
+def make_table(size: int) -> Table:
+    return Table(
+        name=varchar("t"),
+        entries=[Entry(key=varchar(f"k{i}"), value=long(i)) for i in range(size)],
+        keys=[varchar(f"k{i}") for i in range(size)],
+        counts=[short(i) for i in range(size)],
+        note="n",
+    )
+
+
+class TestParallel(TestCase):
+    def test_threads(self):
+        table = make_table(1000)
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(table.buildParallel(executor, 64), table.build())
+            # short vectors are built in place
+            small = make_table(10)
+            self.assertEqual(small.buildParallel(executor), small.build())
+
+    def test_vector_value(self):
+        table = make_table(10)
+        table.keys = vector[varchar](*[varchar(f"k{i}") for i in range(10)])
+        with ThreadPoolExecutor(2) as executor:
+            self.assertEqual(table.buildParallel(executor, 3), table.build())
+
+    def test_processes(self):
+        table = make_table(300)
+        with ProcessPoolExecutor(2) as executor:
+            self.assertEqual(table.buildParallel(executor, 100), table.build())
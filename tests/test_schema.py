@@ -0,0 +1,83 @@
+from unittest import TestCase
+from pynarist import Model, parseFramed, varchar, short, long, vector, endian, union
+from pynarist._errors import ParseError
+from pynarist._schema import describe, fingerprint
+
+
+class Address(Model):
+    host: varchar
+    port: short
+
+
+class Request(Model):
+    address: Address
+    path: str
+
+
+class Response(Model):
+    code: short
+    sizes: vector[long]
+
+
+class TestSchema(TestCase):
+    def test_describe(self):
+        self.assertEqual(describe(Address), "Address={host:varchar,port:short}")
+        self.assertEqual(
+            describe(Request),
+            "Request={address:Address={host:varchar,port:short},path:str}",
+        )
+        self.assertEqual(describe(vector[long]), "vector[TYPE_ELEMENT=long]")
+        self.assertEqual(
+            describe(endian[int, "<"]), "endian[BYTEORDER='<',TYPE_ELEMENT=int]"
+        )
+        self.assertEqual(
+            describe(union[Address, short]),
+            "union[TYPE_MEMBERS=(Address={host:varchar,port:short},short)]",
+        )
+
+    def test_fingerprint(self):
+        self.assertEqual(Request.fingerprint(), fingerprint(Request))
+        self.assertNotEqual(Request.fingerprint(), Response.fingerprint())
+
+        class Other(Model):
+            host: varchar
+            port: int
+
+        self.assertNotEqual(Other.fingerprint(), Address.fingerprint())
+
+        # union members are described with their fields
+        class Before(Model):
+            a: int
+
+        class After(Model):
+            a: long
+
+        After.__name__ = Before.__name__
+        self.assertNotEqual(
+            fingerprint(union[Before, short]), fingerprint(union[After, short])
+        )
+
+    def test_framed(self):
+        request = Request(address=Address(host=varchar("a"), port=short(80)), path="/")
+        response = Response(code=short(200), sizes=vector[long](long(1), long(2)))
+        self.assertEqual(parseFramed(request.buildFramed()), request)
+        self.assertEqual(parseFramed(response.buildFramed()), response)
+
+        with self.assertRaises(ParseError):
+            parseFramed(b"\x00" * 8 + response.build())
+        with self.assertRaises(ParseError):
+            parseFramed(b"\x00")
+
+    def test_framed_conflict(self):
+        def declare():
+            class Twin(Model):
+                value: short
+
+            return Twin
+
+        first, second = declare(), declare()
+        self.assertEqual(first.fingerprint(), second.fingerprint())
+        # neither model can be picked for the frame
+        with self.assertRaises(ParseError):
+            parseFramed(first(value=short(1)).buildFramed())
+        self.assertEqual(parseFramed(Address(host=varchar("a"), port=short(1)).buildFramed()).port, 1)
@@ -0,0 +1,148 @@
+import io
+from unittest import TestCase
+from pynarist import (
+    Model,
+    Decoder,
+    varchar,
+    short,
+    long,
+    byte,
+    vector,
+    array,
+    chunked,
+    union,
+    ParseLimits,
+)
+from pynarist._errors import BuildError, ParseError, UsageError
+
+
+class Address(Model):
+    x0: byte
+    x1: byte
+
+
+class Log(Model):
+    address: Address
+    name: varchar
+    text: str
+    codes: vector[short]
+    pair: array[long, 2]
+
+
+def make_log(i: int) -> Log:
+    return Log(
+        address=Address(x0=byte(i), x1=byte(i + 1)),
+        name=varchar(f"user_{i}"),
+        text="GET /index.html" * i,
+        codes=vector[short](*(short(c) for c in range(i))),
+        pair=array[long, 2](long(i), long(-i)),
+    )
+
+
+class TestDecoder(TestCase):
+    def test_feed_whole(self):
+        logs = [make_log(i) for i in range(5)]
+        decoder = Decoder(Log)
+        self.assertEqual(decoder.feed(b"".join(x.build() for x in logs)), logs)
+        self.assertEqual(decoder.pending, 0)
+        decoder.close()
+
+    def test_feed_bytewise(self):
+        logs = [make_log(i) for i in range(5)]
+        data = b"".join(x.build() for x in logs)
+        decoder = Decoder(Log)
+        result = []
+        for i in range(len(data)):
+            result.extend(decoder.feed(data[i : i + 1]))
+        self.assertEqual(result, logs)
+        decoder.close()
+
+    def test_feed_partial(self):
+        data = make_log(3).build()
+        decoder = Decoder(Log)
+        self.assertEqual(decoder.feed(data[:-3]), [])
+        with self.assertRaises(ParseError):
+            decoder.close()
+        self.assertEqual(decoder.feed(data[-3:] + data), [make_log(3)] * 2)
+
+    def test_failed(self):
+        class Tagged(Model):
+            u: union[short, varchar]
+
+        good = Tagged(u=short(1)).build()
+        decoder = Decoder(Tagged)
+        with self.assertRaises(ParseError):
+            decoder.feed(b"\x09\x00\x00")
+        # the stream is misaligned, so the decoder stays failed
+        with self.assertRaises(ParseError):
+            decoder.feed(good)
+        with self.assertRaises(ParseError):
+            decoder.close()
+
+        decoder = Decoder(Log, ParseLimits(maxStringBytes=2))
+        with self.assertRaises(ParseError):
+            decoder.feed(make_log(3).build())
+        with self.assertRaises(ParseError):
+            decoder.feed(make_log(0).build())
+
+    def test_unstreamable(self):
+        class Empty(Model):
+            pass
+
+        with self.assertRaises(UsageError):
+            Decoder(Empty).feed(b"\x00")
+
+
+class Logs(Model):
+    logs: vector[Log]
+
+
+class ChunkedLogs(Model):
+    logs: chunked[Log]
+
+
+class Unseekable(io.RawIOBase):
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self.data += b
+        return len(b)
+
+
+class TestEncoder(TestCase):
+    def test_build_to(self):
+        logs = [make_log(i) for i in range(5)]
+        stream = io.BytesIO()
+        Logs(logs=vector[Log](*logs)).buildTo(stream)
+        self.assertEqual(stream.getvalue(), Logs(logs=vector[Log](*logs)).build())
+
+    def test_vector_from_iterator(self):
+        logs = [make_log(i) for i in range(5)]
+        stream = io.BytesIO(b"head")
+        stream.seek(4)
+        Logs(logs=iter(logs)).buildTo(stream)  # type: ignore
+        self.assertEqual(stream.getvalue()[:4], b"head")
+        self.assertEqual(Logs.parse(stream.getvalue()[4:]).logs, logs)
+
+        with self.assertRaises(BuildError):
+            Logs(logs=iter(logs)).buildTo(Unseekable())  # type: ignore
+
+    def test_chunked(self):
+        chunked_log = chunked[Log]
+        chunked_log.CHUNK_LENGTH = 2
+        logs = [make_log(i) for i in range(5)]
+
+        class Stream(Model):
+            logs: chunked_log  # type: ignore
+
+        stream = Unseekable()
+        Stream(logs=(x for x in logs)).buildTo(stream)  # type: ignore
+        data = bytes(stream.data)
+        self.assertEqual(data, Stream(logs=chunked_log(*logs)).build())
+        self.assertEqual(Stream.parse(data).logs, logs)
+        self.assertEqual(Decoder(Stream).feed(data)[0].logs, logs)
+        self.assertEqual(ChunkedLogs.parse(b"\x00\x00\x00\x00").logs, [])